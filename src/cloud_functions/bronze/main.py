@@ -1,11 +1,17 @@
 import functions_framework
 from google.cloud import storage
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+import orjson
 import time
 import math
 import os
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import Tuple
 
 # --- CONFIGURATION ---
@@ -15,16 +21,127 @@ BRONZE_BUCKET_NAME = os.environ.get("BRONZE_BUCKET_NAME")
 COINGECKO_API_URL = "https://api.coingecko.com/api/v3/coins/markets"
 BATCH_SIZE = 50
 
+# Minimum spacing between the start of two batch requests (seconds), shared by all workers
+BATCH_INTERVAL_SECONDS = 2.0
+
+# Batches kept in flight at once (matches the session's connection pool)
+MAX_CONCURRENT_BATCHES = 4
+
 # To mimic a browser
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
     "Accept": "application/json"
 }
 
+
+class ServerErrorRetry(Retry):
+    """
+    urllib3 Retry that never retries a rate-limit response.
+
+    urllib3 retries any 413/429 carrying a Retry-After header on its own, even outside
+    status_forcelist. Restricting that set to 503 hands every 429 back to
+    fetch_market_data_batch after one request, so its cooldown can pause every worker.
+    """
+
+    RETRY_AFTER_STATUS_CODES = frozenset({503})
+
+
+# I reuse one keep-alive session for every batch (and across warm invocations of the function),
+# so the TCP + TLS handshake with CoinGecko is paid once instead of once per request.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+# Transient server errors (5xx) and dropped connections are retried inside urllib3 on the same
+# pooled connection. 429s are left to fetch_market_data_batch, whose cooldown pauses every worker.
+SERVER_RETRIES = ServerErrorRetry(
+    total=3,
+    backoff_factor=1,  # 1s, 2s, 4s
+    status_forcelist=[500, 502, 503, 504],
+    allowed_methods=["GET"],
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+SESSION.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=MAX_CONCURRENT_BATCHES, max_retries=SERVER_RETRIES))
+
+# Start-time gate shared by the batch workers: each request claims the next free slot,
+# so requests still go out at most once per BATCH_INTERVAL_SECONDS while they overlap in flight.
+_PACE_LOCK = threading.Lock()
+_next_slot = 0.0
+
+def cool_down(seconds: float) -> None:
+    """
+    Pushes the shared gate 'seconds' into the future after a 429.
+
+    Called as soon as the rate limit is seen (even on a batch's last attempt), so every
+    worker cools down, not only the one that was throttled.
+
+    Args:
+        seconds (float): The cooldown requested by the server (or the backoff default).
+    """
+    global _next_slot
+    with _PACE_LOCK:
+        _next_slot = max(_next_slot, time.monotonic() + seconds)
+
+def wait_for_slot() -> None:
+    """
+    Blocks until the caller may send its next request.
+    """
+    global _next_slot
+    with _PACE_LOCK:
+        now = time.monotonic()
+        start = max(now, _next_slot)
+        _next_slot = start + BATCH_INTERVAL_SECONDS
+    if start > now:
+        time.sleep(start - now)
+
+def retry_after_seconds(response: requests.Response, default: float) -> float:
+    """
+    Reads the server's requested cooldown from a 429 response.
+
+    Args:
+        response (requests.Response): The throttled response.
+        default (float): The cooldown to use when 'Retry-After' is missing or unparsable.
+
+    Returns:
+        float: Seconds to wait, plus up to 0.5s of jitter so the workers don't retry in lockstep.
+    """
+    retry_after = response.headers.get("Retry-After", "").strip()
+    wait_time = default
+    if retry_after.isdigit():
+        wait_time = int(retry_after)
+    elif retry_after:
+        # Retry-After may also be an HTTP-date
+        try:
+            wait_time = max(0.0, (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds())
+        except (TypeError, ValueError):
+            pass
+    return wait_time + random.uniform(0, 0.5)
+
+# Successful batch responses are kept this long (seconds) on a warm instance, so a re-run or
+# retried invocation inside the window doesn't spend rate limit on an identical request.
+# CoinGecko only refreshes /coins/markets about once a minute, so the data is the same anyway.
+MARKET_CACHE_TTL_SECONDS = 60
+_MARKET_CACHE = {}  # frozenset(coin_ids) -> (expires_at, records)
+_CACHE_LOCK = threading.Lock()
+
 # Default to a safe list if env is missing.
 DEFAULT_CRYPTO_COINS = "bitcoin,ethereum,solana,cardano,binancecoin,ripple,dogecoin,chainlink,uniswap,litecoin,polkadot,matic-network,stellar,vechain"
 TARGET_CRYPTO_COINS = os.getenv("CRYPTO_COINS", DEFAULT_CRYPTO_COINS)
 
+def parse_coin_list(coins: str) -> tuple:
+    """
+    Splits a comma-separated list of CoinGecko IDs, dropping blanks (e.g. from a trailing comma).
+
+    Args:
+        coins (str): The raw list, e.g. "bitcoin, ethereum,".
+
+    Returns:
+        tuple: The cleaned IDs, e.g. ('bitcoin', 'ethereum').
+    """
+    return tuple(c.strip() for c in coins.split(",") if c.strip())
+
+# The default roster is parsed once per instance; only request overrides are parsed per call.
+COIN_LIST = parse_coin_list(TARGET_CRYPTO_COINS)
+
 def fetch_market_data_batch(coin_ids: list) -> list:
     """
     Fetches market data for a specific list of Coin IDs from CoinGecko.
@@ -40,7 +157,18 @@ def fetch_market_data_batch(coin_ids: list) -> list:
        This would hit the API again, extending the ban duration.
     2. Partial Success: I want to save the batches I *did* successfully fetch, 
        rather than discarding everything because one batch failed.
+
+    Successful responses are cached for MARKET_CACHE_TTL_SECONDS, keyed on the set of IDs
+    (order doesn't matter). Callers always get fresh record copies, because the lineage
+    step stamps the records in place. Failures are never cached.
     """
+    cache_key = frozenset(coin_ids)
+    with _CACHE_LOCK:
+        cached = _MARKET_CACHE.get(cache_key)
+    if cached and cached[0] > time.monotonic():
+        print(f"   ♻️ Cache hit: reusing {len(cached[1])} records fetched less than {MARKET_CACHE_TTL_SECONDS}s ago.")
+        return [dict(record) for record in cached[1]]
+
     params = {
         "vs_currency": "usd",
         "ids": ",".join(coin_ids),
@@ -56,22 +184,32 @@ def fetch_market_data_batch(coin_ids: list) -> list:
     max_retries = 3
 
     for attempt in range(max_retries):
+        wait_for_slot()
         try:
-            # I add headers=HEADERS here
-            response = requests.get(COINGECKO_API_URL, params=params, headers=HEADERS, timeout=30)
+            # The shared SESSION already carries HEADERS
+            response = SESSION.get(COINGECKO_API_URL, params=params, timeout=30)
 
             # Case A: Success
             if response.status_code == 200:
-                return response.json()
+                # orjson parses the body straight from bytes, several times faster than response.json()
+                records = orjson.loads(response.content)
+                now = time.monotonic()
+                with _CACHE_LOCK:
+                    # Drop expired entries so the cache can't grow across many distinct overrides
+                    for key in [k for k, (expires_at, _) in _MARKET_CACHE.items() if expires_at <= now]:
+                        del _MARKET_CACHE[key]
+                    _MARKET_CACHE[cache_key] = (now + MARKET_CACHE_TTL_SECONDS, records)
+                return [dict(record) for record in records]
 
             # Case B: Rate Limit (429) -> Wait and Retry
+            # I honour the server's Retry-After when it sends one, else back off exponentially
             if response.status_code == 429:
-                wait_time = (2 ** attempt) * 5  # 5s, 10s, 20s
-                print(f"   ⚠️ Rate limit (429). Sleeping {wait_time}s before retry {attempt+1}/{max_retries}...")
-                time.sleep(wait_time)
-                continue # Try again
+                wait_time = retry_after_seconds(response, default=(2 ** attempt) * 5)  # 5s, 10s, 20s
+                print(f"   ⚠️ Rate limit (429). Cooling down all batches for {wait_time:.1f}s (attempt {attempt+1}/{max_retries})...")
+                cool_down(wait_time)
+                continue # Try again once the gate reopens
 
-            # Case C: Other Errors (404, 500) -> Give up
+            # Case C: Other Errors (404, or a 5xx that outlived urllib3's retries) -> Give up
             print(f"   ❌ API Error: {response.status_code}")
             return []
 
@@ -95,8 +233,9 @@ def process_ingestion(request) -> Tuple[str, int]:
        - If found, ingests ONLY those coins (useful for backfilling specific assets).
        - If missing, defaults to the 'CRYPTO_COINS' environment variable.
     2. Batching & Fetching:
+       - Batches run concurrently, with request starts paced BATCH_INTERVAL_SECONDS apart.
        - Logic: Graceful Degradation (returns empty list on error) to prevent Cloud Retry Storms.
-    3. Lineage: Injects 'ingested_timestamp' (UTC) into every record.
+    3. Lineage: Stamps 'ingested_timestamp' (UTC) on every record as each batch arrives.
     4. Storage: Uploads the final JSON directly to the Google Cloud Storage (GCS) Bronze Bucket.
 
     Args:
@@ -115,52 +254,51 @@ def process_ingestion(request) -> Tuple[str, int]:
     file_timestamp = capture_time.strftime("%Y%m%d_%H%M%S")
     
     # 2. Dynamic Override Parsing
-    target_coins_str = TARGET_CRYPTO_COINS
+    coin_list = COIN_LIST
     request_json = request.get_json(silent=True)
 
     if request_json and 'coins' in request_json:
         target_coins_str = request_json['coins']
         print(f"🔧 Manual Override: {target_coins_str}")
+        coin_list = parse_coin_list(target_coins_str)
     elif request.args and 'coins' in request.args:
         target_coins_str = request.args['coins']
         print(f"🔧 URL Override: {target_coins_str}")
+        coin_list = parse_coin_list(target_coins_str)
 
-    # Clean and split the string into a list.
-    coin_list = [c.strip() for c in target_coins_str.split(",")]
     total_coins = len(coin_list)
 
     # Calculate batches
     total_batches = math.ceil(total_coins / BATCH_SIZE)
     print(f"📋 Targets: {total_coins} Coins | Batches: {total_batches}")
 
-    all_market_data = []
-
-    # 3. Batch Loop
-    for i in range(0, total_coins, BATCH_SIZE):
-        current_batch_ids = coin_list[i : i + BATCH_SIZE]
-        batch_num = (i // BATCH_SIZE) + 1
+    # 3. Batch Fetching (+ lineage stamp)
+    # Batches run concurrently; wait_for_slot() keeps their start times BATCH_INTERVAL_SECONDS
+    # apart, so N batches take about N * interval + one latency instead of N * (interval + latency).
+    # I stamp each batch as it arrives, so the records are walked once (and isoformat() runs once).
+    ingested_timestamp = capture_time.isoformat()
+    batches = [coin_list[i : i + BATCH_SIZE] for i in range(0, total_coins, BATCH_SIZE)]
 
-        print(f"🔄 Processing Batch {batch_num}/{total_batches} ({len(current_batch_ids)} coins).")
-
-        # Call the new robust fetcher
-        batch_data = fetch_market_data_batch(current_batch_ids)
+    def run_batch(batch_num: int, batch_ids: list) -> list:
+        print(f"🔄 Processing Batch {batch_num}/{total_batches} ({len(batch_ids)} coins).")
+        batch_data = fetch_market_data_batch(batch_ids)
 
         if batch_data:
-            all_market_data.extend(batch_data)
-            print(f"   ✅ Success: {len(batch_data)} records.")
+            print(f"   ✅ Success: Batch {batch_num} returned {len(batch_data)} records.")
         else:
             print(f"   ⚠️ Warning: Batch {batch_num} returned no data.")
+        return batch_data
 
-        # Small buffer between batches to be nice to the API
-        if batch_num < total_batches:
-            time.sleep(2) 
-
-    # 4. Lineage Injection
-    print("💉 Injecting lineage timestamps.")
-    for record in all_market_data:
-        record['ingested_timestamp'] = capture_time.isoformat()
+    all_market_data = []
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_BATCHES) as executor:
+        # map() yields in submission order, so the output keeps the batch order
+        for batch_data in executor.map(run_batch, range(1, total_batches + 1), batches):
+            for record in batch_data:
+                record['ingested_timestamp'] = ingested_timestamp
+            all_market_data.extend(batch_data)
+    print(f"💉 Stamped {len(all_market_data)} records with ingested_timestamp.")
 
-    # 5. Save to GCS
+    # 4. Save to GCS
     if not all_market_data:
         print("❌ No data collected after all attempts.")
         return "Warning: No data collected.", 200
@@ -173,7 +311,8 @@ def process_ingestion(request) -> Tuple[str, int]:
         blob = bucket.blob(output_filename)
 
         blob.upload_from_string(
-            data=json.dumps(all_market_data, indent=4),
+            # Compact orjson bytes: no pretty-printing, the Silver layer's read_json doesn't need it
+            data=orjson.dumps(all_market_data),
             content_type='application/json'
         )
 
@@ -1,8 +1,8 @@
 import functions_framework
 import duckdb
 import os
+import gcsfs
 import requests
-from google.cloud import storage
 from datetime import datetime, timezone
 
 # --- CONFIGURATION ---
@@ -10,11 +10,125 @@ SILVER_BUCKET_NAME = os.environ.get("SILVER_BUCKET_NAME")
 GOLD_BUCKET_NAME = os.environ.get("GOLD_BUCKET_NAME")
 DISCORD_WEBHOOK_URL = os.environ.get("DISCORD_WEBHOOK_URL")
 
+# DuckDB worker threads: the window functions run in parallel across coin_id partitions,
+# so I default to all cores of the instance (override with DUCKDB_THREADS), as in Silver.
+DUCKDB_THREADS = int(os.environ.get("DUCKDB_THREADS", os.cpu_count() or 1))
+
 # --- ANALYTICS CONSTANTS ---
 WINDOW_SIZE = 7
 RSI_PERIOD = 14
 STATE_FILENAME = "analyzed_market_summary.parquet"
 
+# Parquet layout: rows sorted by (coin_id, source_updated_ts) give each row group tight
+# min/max statistics for filter pushdown, and ZSTD ships fewer bytes than Snappy.
+PARQUET_WRITE_OPTIONS = "FORMAT 'PARQUET', COMPRESSION 'ZSTD', COMPRESSION_LEVEL 3, ROW_GROUP_SIZE 64000"
+
+# Columns published as FLOAT (float32) in the partitioned copy read by the dashboard.
+# The state file stays DOUBLE because its history feeds the next window calculation,
+# and prices shown to 4 decimals in the KPI header (current_price, ath) keep full precision.
+FLOAT32_COLUMNS = [
+    "market_cap", "fully_diluted_valuation", "total_volume",
+    "high_24h", "low_24h", "price_change_percentage_24h",
+    "circulating_supply", "total_supply", "max_supply", "ath_change_percentage",
+    "sma_7d", "volatility_7d", "rsi_14d",
+]
+
+# Hive-partitioned copy of the state (market_summary/coin_id=<id>/data_0.parquet).
+# Consumers like the dashboard read only the partition of the asset they display.
+PARTITIONED_PREFIX = "market_summary"
+
+# Pairwise price correlation of every asset (coin_a, coin_b, rho), precomputed for the dashboard
+CORRELATION_FILENAME = "market_correlation.parquet"
+
+# Gold SQL, built once at import so warm instances reuse the same SQL text (as in Silver).
+# Per-run values (input files, analysis time) are bound at execution time as parameters.
+# I added FDV, Volume, Supply, Rank, Changes to match Silver Schema
+COMMON_COLUMNS = """
+    coin_id, symbol, name, current_price, market_cap, market_cap_rank,
+    fully_diluted_valuation, total_volume, 
+    high_24h, low_24h, price_change_percentage_24h,
+    circulating_supply, total_supply, max_supply,
+    ath, ath_change_percentage, ath_date,
+    source_updated_at, ingested_timestamp, processed_at
+"""
+
+# Union Logic (State + New Data)
+# union_by_name lets state files written before 'source_updated_ts' existed be merged;
+# I backfill the epoch key from the ISO string for those rows.
+LOAD_QUERY = f"""
+    CREATE TABLE raw_combined AS
+    SELECT
+        {COMMON_COLUMNS},
+        COALESCE(
+            source_updated_ts,
+            CAST(epoch(TRY_CAST(source_updated_at AS TIMESTAMPTZ)) AS BIGINT)
+        ) as source_updated_ts
+    FROM read_parquet($input_files, union_by_name = true)
+"""
+
+ANALYTICS_QUERY = f"""
+    WITH deduplicated_data AS (
+        SELECT DISTINCT * FROM raw_combined
+    ),
+    price_changes AS (
+        SELECT *,
+            current_price - LAG(current_price) OVER (PARTITION BY coin_id ORDER BY source_updated_ts) as price_diff
+        FROM deduplicated_data
+    ),
+    rolling_stats AS (
+        SELECT *,
+            -- 7-Day SMA
+            AVG(current_price) OVER sma_window as sma_7d,
+
+            -- 7-Day Volatility (sample standard deviation of price)
+            STDDEV_SAMP(current_price) OVER sma_window as volatility_7d,
+
+            -- Rows in the SMA frame (below WINDOW_SIZE during a coin's warm-up)
+            COUNT(*) OVER sma_window as sma_samples,
+
+            -- RSI Components
+            AVG(CASE WHEN price_diff > 0 THEN price_diff ELSE 0 END) OVER rsi_window as avg_gain,
+            AVG(CASE WHEN price_diff < 0 THEN ABS(price_diff) ELSE 0 END) OVER rsi_window as avg_loss
+        FROM price_changes
+        -- Named windows: aggregates over the same frame share one partition/sort pass.
+        -- New rolling aggregates should reuse these instead of spelling out a new OVER (...)
+        WINDOW
+            sma_window AS (PARTITION BY coin_id ORDER BY source_updated_ts ROWS BETWEEN {WINDOW_SIZE - 1} PRECEDING AND CURRENT ROW),
+            rsi_window AS (PARTITION BY coin_id ORDER BY source_updated_ts ROWS BETWEEN {RSI_PERIOD - 1} PRECEDING AND CURRENT ROW)
+    ),
+    final_calculations AS (
+        SELECT *,
+            CASE WHEN avg_loss = 0 THEN 100 ELSE 100 - (100 / (1 + (avg_gain / avg_loss))) END as rsi_14d
+        FROM rolling_stats
+    )
+
+    SELECT 
+        -- Passing through all rich metrics
+        coin_id, symbol, name, current_price, market_cap, market_cap_rank,
+        fully_diluted_valuation, total_volume,
+        high_24h, low_24h, price_change_percentage_24h,
+        circulating_supply, total_supply, max_supply,
+        ath, ath_change_percentage, ath_date,
+
+        -- Calculated Signals
+        sma_7d, volatility_7d, rsi_14d,
+        CASE 
+            -- No signal until the SMA spans a full window: partial-window averages mislead
+            WHEN sma_samples < {WINDOW_SIZE} THEN 'WAIT'
+            WHEN current_price < sma_7d AND rsi_14d < 30 THEN 'BUY'
+            WHEN current_price > sma_7d AND rsi_14d > 70 THEN 'SELL'
+            ELSE 'WAIT'
+        END as signal,
+
+        source_updated_at, source_updated_ts, ingested_timestamp, processed_at,
+        $analyzed_at as analyzed_at
+
+    FROM final_calculations
+    -- Keep only the last 500 records per coin to prevent file explosion
+    QUALIFY ROW_NUMBER() OVER (PARTITION BY coin_id ORDER BY source_updated_ts DESC) <= 500
+    ORDER BY coin_id, source_updated_ts
+"""
+
 def send_discord_alert(coin, price, rsi, signal):
     """
     Sends a formatted alert payload to a configured Discord Webhook.
@@ -70,20 +184,27 @@ def process_analysis(cloud_event):
 
     WORKFLOW:
     1. Ingestion: 
-       - Downloads the new 'cleaned_market_data.parquet' (Rich Schema) from Silver.
-       - Downloads the existing 'analyzed_market_summary.parquet' (History) from Gold.
+       - Reads the new 'cleaned_market_data.parquet' (Rich Schema) from Silver.
+       - Reads the existing 'analyzed_market_summary.parquet' (History) from Gold.
+       - Both are scanned in place (gs:// paths through gcsfs), nothing is staged in /tmp.
     2. State Management: 
        - Merges New Data + Historical Data into a single DuckDB table.
        - Preserves critical metrics (FDV, Volume, Supply, Rank) for deep analytics.
     3. Financial Modeling:
        - Calculates 7-Day Simple Moving Average (SMA).
+       - Calculates 7-Day Volatility (standard deviation of price).
        - Calculates 14-Day Relative Strength Index (RSI).
-       - Generates Signals: BUY (Oversold), SELL (Overbought), WAIT.
+       - Generates Signals: BUY (Oversold), SELL (Overbought), WAIT (also during the SMA warm-up).
     4. Alerting: 
        - Sends real-time Discord notifications for active BUY/SELL signals.
     5. Storage: 
        - Updates the 'analyzed_market_summary.parquet' state file in the Gold Bucket.
        - Prunes history to keep the dataset lightweight (last 500 records per coin).
+       - Writes rows sorted by coin and time with ZSTD compression for row-group skipping.
+       - Publishes a Hive-partitioned copy ('market_summary/coin_id=<id>/') for per-asset reads,
+         with display-only metrics downcast to float32/int32.
+       - Publishes the pairwise price correlation of all assets ('market_correlation.parquet'),
+         computed on gap-filled hourly prices.
 
     Args:
         cloud_event: The CloudEvent object containing the GCS file metadata.
@@ -92,132 +213,113 @@ def process_analysis(cloud_event):
     input_filename = data['name']
     print(f"🚀 Event {cloud_event['id']} triggered. Processing update: {input_filename}")
 
-    # Setup temporary paths
-    local_new_data = f"/tmp/{input_filename}"
-    local_history = "/tmp/history.parquet"
-    local_output = "/tmp/output.parquet"
+    # Setup GCS paths (DuckDB reads and writes them directly)
+    new_data_path = f"gs://{SILVER_BUCKET_NAME}/{input_filename}"
+    history_path = f"gs://{GOLD_BUCKET_NAME}/{STATE_FILENAME}"
+    partitions_path = f"gs://{GOLD_BUCKET_NAME}/{PARTITIONED_PREFIX}"
+    correlation_path = f"gs://{GOLD_BUCKET_NAME}/{CORRELATION_FILENAME}"
 
     try:
-        storage_client = storage.Client()
-
-        # 1. Download data from Silver layer
-        silver_bucket = storage_client.bucket(SILVER_BUCKET_NAME)
-        silver_bucket.blob(input_filename).download_to_filename(local_new_data)
+        # 1. Initialize GCS filesystem (Application Default Credentials)
+        gcs = gcsfs.GCSFileSystem()
 
-        # 2. Download history data
-        gold_bucket = storage_client.bucket(GOLD_BUCKET_NAME)
-        history_blob = gold_bucket.blob(STATE_FILENAME)
-
-        has_history = False
-        if history_blob.exists():
-            print(f"📥 Downloading History: {STATE_FILENAME}")
-            history_blob.download_to_filename(local_history)
-            has_history = True
+        # 2. Check history data
+        has_history = gcs.exists(history_path)
+        if has_history:
+            print(f"📥 Reading History in place: {history_path}")
         else:
             print("⚠️ No history found. Starting fresh state.")
 
         # 3. Configure DuckDB
         con = duckdb.connect(database=":memory:")
         con.execute("PRAGMA memory_limit='800MB';")
+        con.execute(f"PRAGMA threads={DUCKDB_THREADS};")
+        # No terminal to draw on in Cloud Run
+        con.execute("PRAGMA disable_progress_bar;")
+        # I register gcsfs so DuckDB can scan and COPY to gs:// without the httpfs
+        # extension (which only accepts HMAC keys for GCS, not the function's service account)
+        con.register_filesystem(gcs)
 
-        # 4. Define Table Loading Logic
-        # I added FDV, Volume, Supply, Rank, Changes to match Silver Schema
-        common_columns = """
-            coin_id, symbol, name, current_price, market_cap, market_cap_rank,
-            fully_diluted_valuation, total_volume, 
-            high_24h, low_24h, price_change_percentage_24h,
-            circulating_supply, total_supply, max_supply,
-            ath, ath_change_percentage, ath_date,
-            source_updated_at, ingested_file, processed_at
-        """
-
-        # Union Logic (State + New Data)
-        if has_history:
-            # I use distinct to prevent duplicates if the function runs twice
-            con.execute(f"""
-                CREATE TABLE raw_combined AS 
-                SELECT {common_columns} FROM '{local_history}'
-                UNION ALL 
-                SELECT {common_columns} FROM '{local_new_data}'
-            """)
-        else:
-            con.execute(f"CREATE TABLE raw_combined AS SELECT * FROM '{local_new_data}'")
+        # 4. Load State + New Data
+        input_files = [history_path, new_data_path] if has_history else [new_data_path]
+        con.execute(LOAD_QUERY, {"input_files": input_files})
 
         # 5. The Financial Query
         analysis_time = datetime.now(timezone.utc).isoformat()
-
-        query = f"""
-            WITH deduplicated_data AS (
-                SELECT DISTINCT * FROM raw_combined
-            ),
-            price_changes AS (
-                SELECT *,
-                    current_price - LAG(current_price) OVER (PARTITION BY coin_id ORDER BY source_updated_at) as price_diff
-                FROM deduplicated_data
-            ),
-            rolling_stats AS (
-                SELECT *,
-                    -- 7-Day SMA
-                    AVG(current_price) OVER (PARTITION BY coin_id ORDER BY source_updated_at ROWS BETWEEN {WINDOW_SIZE - 1} PRECEDING AND CURRENT ROW) as sma_7d,
-
-                    -- RSI Components
-                    AVG(CASE WHEN price_diff > 0 THEN price_diff ELSE 0 END) OVER (PARTITION BY coin_id ORDER BY source_updated_at ROWS BETWEEN {RSI_PERIOD - 1} PRECEDING AND CURRENT ROW) as avg_gain,
-                    AVG(CASE WHEN price_diff < 0 THEN ABS(price_diff) ELSE 0 END) OVER (PARTITION BY coin_id ORDER BY source_updated_at ROWS BETWEEN {RSI_PERIOD - 1} PRECEDING AND CURRENT ROW) as avg_loss
-                FROM price_changes
-            ),
-            final_calculations AS (
-                SELECT *,
-                    CASE WHEN avg_loss = 0 THEN 100 ELSE 100 - (100 / (1 + (avg_gain / avg_loss))) END as rsi_14d
-                FROM rolling_stats
-            )
-
-            SELECT 
-                -- Passing through all rich metrics
-                coin_id, symbol, name, current_price, market_cap, market_cap_rank,
-                fully_diluted_valuation, total_volume,
-                high_24h, low_24h, price_change_percentage_24h,
-                circulating_supply, total_supply, max_supply,
-                ath, ath_change_percentage, ath_date,
-
-                -- Calculated Signals
-                sma_7d, rsi_14d,
-                CASE 
-                    WHEN current_price < sma_7d AND rsi_14d < 30 THEN 'BUY'
-                    WHEN current_price > sma_7d AND rsi_14d > 70 THEN 'SELL'
-                    ELSE 'WAIT'
-                END as signal,
-
-                source_updated_at, ingested_file, processed_at,
-                '{analysis_time}' as analyzed_at
-
-            FROM final_calculations
-            -- Keep only the last 500 records per coin to prevent file explosion
-            QUALIFY ROW_NUMBER() OVER (PARTITION BY coin_id ORDER BY source_updated_at DESC) <= 500
-            ORDER BY source_updated_at DESC, coin_id
-        """
-
-        con.execute(f"COPY ({query}) TO '{local_output}' (FORMAT 'PARQUET', COMPRESSION 'SNAPPY')")
+        con.execute(f"CREATE TABLE gold_output AS {ANALYTICS_QUERY}", {"analyzed_at": analysis_time})
 
         # 6. Check alerts
-        latest_row = con.execute(f"SELECT symbol, current_price, rsi_14d, signal FROM '{local_output}' ORDER BY source_updated_at DESC LIMIT 1").fetchone()
+        latest_row = con.execute("SELECT symbol, current_price, rsi_14d, signal FROM gold_output ORDER BY source_updated_ts DESC LIMIT 1").fetchone()
 
         if latest_row and latest_row[3] != "WAIT":
             # Only alert on BUY or SELL, not WAIT
             send_discord_alert(latest_row[0], latest_row[1], latest_row[2], latest_row[3])
 
-        # 7. Save State
-        gold_bucket.blob(STATE_FILENAME).upload_from_filename(local_output)
+        # 7. Save State (written straight to the Gold Bucket)
+        con.execute(f"COPY gold_output TO '{history_path}' ({PARQUET_WRITE_OPTIONS})")
         print("✅ Gold Layer Success. State Updated.")
 
-        # Cleanup
-        if os.path.exists(local_new_data): os.remove(local_new_data)
-        if os.path.exists(local_history): os.remove(local_history)
-        if os.path.exists(local_output): os.remove(local_output)
+        # 8. Publish the per-coin partitions (one small file per asset), downcast for display
+        downcasts = ", ".join(f"CAST({col} AS FLOAT) AS {col}" for col in FLOAT32_COLUMNS)
+        con.execute(f"""
+            COPY (
+                SELECT * REPLACE ({downcasts}, CAST(market_cap_rank AS INTEGER) AS market_cap_rank)
+                FROM gold_output
+                ORDER BY coin_id, source_updated_ts
+            )
+            TO '{partitions_path}'
+            ({PARQUET_WRITE_OPTIONS}, PARTITION_BY (coin_id), OVERWRITE_OR_IGNORE)
+        """)
+
+        print(f"📦 Published partitions to {partitions_path}/")
+
+        # 9. Publish the cross-asset correlation matrix
+        # Prices are averaged per hour and laid on one shared hourly grid; gaps are
+        # forward-filled (back-filled before an asset's first hour) so every pair is
+        # compared on the same hours.
+        con.execute(f"""
+            COPY (
+                WITH hourly_prices AS (
+                    SELECT coin_id, source_updated_ts // 3600 as hour_bucket, AVG(current_price) as price
+                    FROM gold_output
+                    GROUP BY coin_id, hour_bucket
+                ),
+                hour_grid AS (
+                    SELECT UNNEST(range(MIN(hour_bucket), MAX(hour_bucket) + 1)) as hour_bucket
+                    FROM hourly_prices
+                ),
+                filled_prices AS (
+                    SELECT
+                        coins.coin_id,
+                        hour_grid.hour_bucket,
+                        COALESCE(
+                            LAST_VALUE(hourly_prices.price IGNORE NULLS) OVER (
+                                PARTITION BY coins.coin_id ORDER BY hour_grid.hour_bucket
+                                ROWS BETWEEN UNBOUNDED PRECEDING AND CURRENT ROW
+                            ),
+                            FIRST_VALUE(hourly_prices.price IGNORE NULLS) OVER (
+                                PARTITION BY coins.coin_id ORDER BY hour_grid.hour_bucket
+                                ROWS BETWEEN CURRENT ROW AND UNBOUNDED FOLLOWING
+                            )
+                        ) as price
+                    FROM (SELECT DISTINCT coin_id FROM hourly_prices) coins
+                    CROSS JOIN hour_grid
+                    LEFT JOIN hourly_prices
+                        ON hourly_prices.coin_id = coins.coin_id
+                        AND hourly_prices.hour_bucket = hour_grid.hour_bucket
+                )
+                SELECT a.coin_id as coin_a, b.coin_id as coin_b, CORR(a.price, b.price) as rho
+                FROM filled_prices a
+                JOIN filled_prices b USING (hour_bucket)
+                GROUP BY coin_a, coin_b
+                ORDER BY coin_a, coin_b
+            )
+            TO '{correlation_path}'
+            ({PARQUET_WRITE_OPTIONS})
+        """)
+        print(f"🔗 Published correlation matrix to {correlation_path}")
         return "Success"
 
     except Exception as error:
         print(f"❌ Critical Error in Gold Cloud Function: {error}")
-        # Cleanup
-        if os.path.exists(local_new_data): os.remove(local_new_data)
-        if os.path.exists(local_history): os.remove(local_history)
         raise error
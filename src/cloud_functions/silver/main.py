@@ -7,6 +7,78 @@ from google.cloud import storage
 BRONZE_BUCKET_NAME = os.environ.get("BRONZE_BUCKET_NAME")
 SILVER_BUCKET_NAME = os.environ.get("SILVER_BUCKET_NAME")
 
+# DuckDB worker threads. One thread left every extra vCPU idle while parsing JSON,
+# so I default to all cores of the instance (override with DUCKDB_THREADS).
+DUCKDB_THREADS = int(os.environ.get("DUCKDB_THREADS", os.cpu_count() or 1))
+
+# Explicit schema of the CoinGecko /coins/markets payload written by the Bronze layer.
+# I pass it to read_json so DuckDB skips the sampling pass it needs to infer types.
+# Timestamps stay VARCHAR on purpose: Silver has always emitted them as ISO strings and
+# the Gold state file depends on that type when it unions new data with its history.
+BRONZE_SCHEMA = {
+    "id": "VARCHAR",
+    "symbol": "VARCHAR",
+    "name": "VARCHAR",
+    "current_price": "DOUBLE",
+    "market_cap": "DOUBLE",
+    "market_cap_rank": "BIGINT",
+    "total_volume": "DOUBLE",
+    "high_24h": "DOUBLE",
+    "low_24h": "DOUBLE",
+    "price_change_percentage_24h": "DOUBLE",
+    "circulating_supply": "DOUBLE",
+    "total_supply": "DOUBLE",
+    "max_supply": "DOUBLE",
+    "ath": "DOUBLE",
+    "ath_change_percentage": "DOUBLE",
+    "ath_date": "VARCHAR",
+    "last_updated": "VARCHAR",
+    "ingested_timestamp": "VARCHAR",
+}
+BRONZE_COLUMNS_SQL = "{" + ", ".join(f"'{name}': '{dtype}'" for name, dtype in BRONZE_SCHEMA.items()) + "}"
+
+# Silver cleaning query, built once at import so warm instances reuse the same SQL text.
+# The Bronze file path is bound at execution time through the $input_path parameter.
+CLEANING_QUERY = f"""
+        SELECT DISTINCT
+            id as coin_id,
+            symbol,
+            name,
+            current_price,
+            market_cap,
+            market_cap_rank,
+
+            -- Safe FDV Calculation (Critical for Gold Layer)
+            CASE 
+                WHEN max_supply IS NULL THEN (current_price * total_supply)
+                ELSE (current_price * max_supply)
+            END as fully_diluted_valuation,
+
+            total_volume,
+            high_24h,
+            low_24h,
+            price_change_percentage_24h,
+            circulating_supply,
+            total_supply,
+            max_supply,
+            ath,
+            ath_change_percentage,
+            ath_date,
+
+            -- Timestamp & Lineage
+            last_updated as source_updated_at,
+            CAST(epoch(TRY_CAST(last_updated AS TIMESTAMPTZ)) AS BIGINT) as source_updated_ts,
+            ingested_timestamp, 
+            current_timestamp as processed_at
+
+        FROM read_json(
+            $input_path,
+            columns={BRONZE_COLUMNS_SQL},
+            format='array',
+            maximum_object_size=16777216
+        )
+"""
+
 @functions_framework.cloud_event
 def process_cleaning(cloud_event):
     """
@@ -17,12 +89,13 @@ def process_cleaning(cloud_event):
 
     WORKFLOW:
     1. Input Parsing: Extracts filename from the Google Cloud Storage event.
-    2. DuckDB Setup: Configures memory limits (512MB) for Cloud Run environment.
+    2. DuckDB Setup: Configures memory limits (512MB) and one thread per vCPU for Cloud Run.
     3. Transformation (Schema Parity):
-       - Loads raw JSON.
+       - Loads raw JSON with an explicit schema (no auto-inference sampling).
        - Applies the EXACT same SQL logic as the Local Pipeline (clean.py).
        - Calculates 'Safe FDV' (Fully Diluted Valuation) handling NULL Max Supply.
        - Preserves critical metrics (Volume, Rank, ATH) previously missing in Cloud V1.
+       - Adds 'source_updated_ts' (epoch seconds) as an integer sort key for downstream layers.
     4. Storage: Saves as optimized Parquet (Snappy compression) and uploads to Silver Bucket.
 
     Args:
@@ -54,51 +127,17 @@ def process_cleaning(cloud_event):
         # 3. Configure DuckDB
         con = duckdb.connect(database=":memory:")
         con.execute("PRAGMA memory_limit='512MB';")
-        con.execute("PRAGMA threads=1;")
+        con.execute(f"PRAGMA threads={DUCKDB_THREADS};")
 
         # 4. Clean Data
         print("⚙️ Cleaning data with DuckDB.")
 
-        query = f"""
-            SELECT DISTINCT
-                id as coin_id,
-                symbol,
-                name,
-                current_price,
-                market_cap,
-                market_cap_rank,
-
-                -- Safe FDV Calculation (Critical for Gold Layer)
-                CASE 
-                    WHEN max_supply IS NULL THEN (current_price * total_supply)
-                    ELSE (current_price * max_supply)
-                END as fully_diluted_valuation,
-
-                total_volume,
-                high_24h,
-                low_24h,
-                price_change_percentage_24h,
-                circulating_supply,
-                total_supply,
-                max_supply,
-                ath,
-                ath_change_percentage,
-                ath_date,
-
-                -- Timestamp & Lineage
-                last_updated as source_updated_at,
-                ingested_timestamp, 
-                current_timestamp as processed_at
-
-            FROM read_json_auto('{local_input}')
-        """
+        # The input path is bound as a parameter and the output path goes through the
+        # relation API, so no file name is ever spliced into the SQL text.
+        cleaned = con.sql(CLEANING_QUERY, params={"input_path": local_input})
 
         # 5. Save to Local Parquet
-        con.execute(f"""
-            COPY ({query}) 
-            TO '{local_output}' 
-            (FORMAT 'PARQUET', COMPRESSION 'SNAPPY')
-        """)
+        cleaned.write_parquet(local_output, compression="snappy")
 
         print(f"✅ Data cleaned and saved locally to {local_output}")
 
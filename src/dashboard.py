@@ -1,11 +1,14 @@
 import streamlit as st
 import pandas as pd
-import plotly.graph_objects as go
+import pyarrow.dataset as ds
+import pyarrow.fs as pafs
 from pathlib import Path
-from google.cloud import storage
-import io
 import os
+import time
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv, find_dotenv
+from dashboard_utils import format_large_number, downsample_lttb
 
 # --- SETUP ---
 # Automatically find and load .env file
@@ -14,91 +17,403 @@ load_dotenv(find_dotenv())
 # --- CONFIGURATION ---
 ST_PAGE_TITLE = "🪙 Crypto Strategy Command Center"
 CLOUD_BUCKET_NAME = os.getenv("GOLD_BUCKET_NAME")
-PARQUET_FILENAME = "analyzed_market_summary.parquet"
+# Hive-partitioned Gold dataset (market_summary/coin_id=<id>/*.parquet)
+PARTITIONED_DIRNAME = "market_summary"
+# Unpartitioned Gold state file. The local pipeline does not publish the partitioned copy,
+# so LOCAL mode falls back to this file when market_summary/ is missing.
+STATE_FILENAME = "analyzed_market_summary.parquet"
+# Pairwise asset correlation (coin_a, coin_b, rho) precomputed by the Gold layer
+CORRELATION_FILENAME = "market_correlation.parquet"
+TIME_COL = "source_updated_at"
+# Epoch-seconds sort key written by Silver/Gold. I sort and group on the integer and only
+# materialize TIME_COL (datetime) from it for the Plotly axes.
+TS_COL = "source_updated_ts"
+
+# Column projection: the only Gold columns the dashboard renders.
+# Everything else in the Rich Schema is never decoded.
+DASHBOARD_COLUMNS = [
+    "coin_id", "name", TS_COL, "current_price", "sma_7d", "volatility_7d", "rsi_14d", "signal",
+    "market_cap", "market_cap_rank", "fully_diluted_valuation", "total_volume", "ath"
+]
+
+# Chart series that are downcast to float32 before reaching Plotly.
+# Single precision is plenty for a line chart and halves the payload.
+CHART_COLUMNS = ["current_price", "sma_7d", "rsi_14d", "total_volume"]
+
+# History window loaded by the dashboard; older rows are pruned during the Parquet scan
+HISTORY_DAYS = 90
+
+# Upper bound on points per trace sent to the browser (LTTB downsampling)
+MAX_CHART_POINTS = 2000
+
+# Largest correlation matrix rendered (top assets by market cap rank); the styled
+# table is rendered cell by cell in the browser
+MAX_HEATMAP_ASSETS = 25
+
+# Concurrent GCS downloads when refreshing the cloud mirror (one small file per asset)
+MAX_DOWNLOAD_WORKERS = 16
 
 # Define Paths
 BASE_DIR = Path(__file__).resolve().parent.parent
-LOCAL_GOLD_PATH = BASE_DIR / "data" / "gold" / PARQUET_FILENAME
+LOCAL_GOLD_DIR = BASE_DIR / "data" / "gold"
+LOCAL_GOLD_PATH = LOCAL_GOLD_DIR / PARTITIONED_DIRNAME
+LOCAL_STATE_PATH = LOCAL_GOLD_DIR / STATE_FILENAME
+# Local mirror of the cloud Gold bucket. Every file keeps a hidden '.<name>.version' sidecar
+# with the GCS object version (update time + size) it was downloaded at (hidden, so pyarrow
+# never treats it as data).
+CLOUD_CACHE_DIR = Path(tempfile.gettempdir()) / "gold_cache"
+CLOUD_CACHE_PATH = CLOUD_CACHE_DIR / PARTITIONED_DIRNAME
 
 # Setup page config
 st.set_page_config(page_title=ST_PAGE_TITLE, layout="wide", page_icon="🪙")
 st.title(f"📊 {ST_PAGE_TITLE}")
 
 # --- DATA LOADER ---
+def get_local_gold_source():
+    """
+    Resolves which local 'Gold Layer' source the dashboard reads.
+
+    The partitioned 'market_summary' dataset is preferred. When only the single
+    'analyzed_market_summary.parquet' state file exists, that file is read instead.
+
+    Returns:
+        Path | None: The partitioned dataset directory, the state file, or None if neither exists.
+    """
+    if LOCAL_GOLD_PATH.exists():
+        return LOCAL_GOLD_PATH
+    if LOCAL_STATE_PATH.exists():
+        return LOCAL_STATE_PATH
+    return None
+
+def get_cloud_filesystem():
+    """
+    Returns a pyarrow filesystem rooted at the Gold bucket.
+
+    pyarrow's native GCS client authenticates with Application Default Credentials
+    (like google-cloud-storage) and streams objects in chunks instead of buffering
+    whole files in Python memory.
+
+    Returns:
+        pyarrow.fs.SubTreeFileSystem: Paths are relative to gs://<GOLD_BUCKET_NAME>/.
+    """
+    return pafs.SubTreeFileSystem(CLOUD_BUCKET_NAME, pafs.GcsFileSystem())
+
 @st.cache_data(ttl=600)
-def load_data(source_mode):
+def list_assets(source_mode):
     """
-    Loads the 'Gold Layer' analytics data from the selected source.
+    Lists the assets available in the partitioned 'Gold Layer' dataset.
 
-    This function uses Streamlit's caching mechanism (@st.cache_data) to store 
-    the result for 10 minutes (600s), preventing redundant network requests or 
-    disk reads during user interaction.
+    Only the partition folder names (coin_id=<id>) are inspected, so no Parquet
+    data is read or downloaded to populate the asset selector.
 
     Args:
-        source_mode (str): The data origin.
-            - "LOCAL": Reads 'analyzed_market_summary.parquet' from the local 'data/gold/' directory.
-                       Useful for development and backtesting results.
-            - "CLOUD": Downloads the same file directly from the configured Google Cloud Storage bucket.
-                       Useful for monitoring the live production pipeline.
+        source_mode (str): The data origin ("LOCAL" or "CLOUD").
 
     Returns:
-        pd.DataFrame: A pandas DataFrame containing the historical market data, 
-                      enriched with financial metrics (RSI, SMA, FDV, Volume).
-                      Returns an empty DataFrame if the file is missing or connection fails.
+        list[str]: The sorted coin IDs (e.g., ['bitcoin', 'ethereum']).
+                   Returns an empty list if the dataset is missing or connection fails.
     """
     # 1. LOCAL MODE
     if source_mode == "LOCAL":
-        if not LOCAL_GOLD_PATH.exists():
-            st.error(f"❌ Local file not found: {LOCAL_GOLD_PATH}")
-            st.warning("Tip: Run 'make local' to generate it.")
-            return pd.DataFrame()
-        try:
-            return pd.read_parquet(LOCAL_GOLD_PATH, engine='fastparquet')
-        except Exception as error:
-            st.error(f"❌ Error reading local file: {error}")
-            return pd.DataFrame()
+        local_source = get_local_gold_source()
+        if local_source is None:
+            st.error(f"❌ Local dataset not found: {LOCAL_GOLD_PATH} (or {LOCAL_STATE_PATH})")
+            st.warning(f"Tip: gsutil cp gs://<GOLD_BUCKET_NAME>/{STATE_FILENAME} {LOCAL_GOLD_DIR}/")
+            return []
+        if local_source == LOCAL_STATE_PATH:
+            # Unpartitioned state file: coin_id is a regular column, so only that column is decoded
+            coin_ids = ds.dataset(local_source, format="parquet").to_table(columns=["coin_id"])
+            return sorted(coin_ids.column("coin_id").unique().to_pylist())
+        return sorted(folder.name.split("=")[1] for folder in LOCAL_GOLD_PATH.glob("coin_id=*"))
 
     # 2. CLOUD MODE
     elif source_mode == "CLOUD":
         if not CLOUD_BUCKET_NAME:
             st.error("❌ GOLD_BUCKET_NAME not found in .env file.")
-            return pd.DataFrame()
+            return []
         try:
-            storage_client = storage.Client()
-            bucket = storage_client.bucket(CLOUD_BUCKET_NAME)
-            blob = bucket.blob(PARQUET_FILENAME)
-
-            if not blob.exists():
-                st.error(f"❌ Cloud file not found: gs://{CLOUD_BUCKET_NAME}/{PARQUET_FILENAME}")
-                return pd.DataFrame()
-
-            data_bytes = blob.download_as_bytes()
-            return pd.read_parquet(io.BytesIO(data_bytes), engine='fastparquet')
+            # Non-recursive listing: returns the partition "directories" only
+            entries = get_cloud_filesystem().get_file_info(pafs.FileSelector(PARTITIONED_DIRNAME))
+            return sorted(
+                entry.base_name.split("=")[1]
+                for entry in entries
+                if entry.type == pafs.FileType.Directory and entry.base_name.startswith("coin_id=")
+            )
         except Exception as error:
             st.error(f"❌ Cloud Connection Failed: {error}")
-            return pd.DataFrame()
+            return []
+
+    return []
+
+@st.cache_data(ttl=600)
+def sync_cloud_dataset():
+    """
+    Mirrors the 'Gold Layer' files the dashboard reads (the partitioned dataset and
+    the correlation matrix) from Google Cloud Storage into /tmp.
+
+    A single recursive listing returns the version (update time + size) of every
+    object. A file is only downloaded when its version differs from the one recorded
+    next to the local copy, so a warm container moves zero Parquet bytes while the
+    Gold layer has not been rewritten. Changed files are streamed to disk through
+    pyarrow's GCS filesystem (concurrently), and partitions that disappeared from the
+    bucket are removed.
+    """
+    cloud_fs = get_cloud_filesystem()
+    entries = cloud_fs.get_file_info(pafs.FileSelector(PARTITIONED_DIRNAME, recursive=True))
+    entries += cloud_fs.get_file_info([CORRELATION_FILENAME])
+    synced_files = set()
+    pending_downloads = []
+
+    for entry in entries:
+        if entry.type != pafs.FileType.File or not entry.path.endswith(".parquet"):
+            continue
+
+        local_file = CLOUD_CACHE_DIR / entry.path
+        version_file = local_file.with_name(f".{local_file.name}.version")
+        version = f"{entry.mtime_ns}:{entry.size}"
+        synced_files.add(local_file)
+
+        # Skip the download when the cached copy is already at this version
+        if local_file.exists() and version_file.exists() and version_file.read_text() == version:
+            continue
+
+        pending_downloads.append((entry.path, local_file, version_file, version))
+
+    def download(job):
+        remote_path, local_file, version_file, version = job
+        local_file.parent.mkdir(parents=True, exist_ok=True)
+        pafs.copy_files(remote_path, str(local_file), source_filesystem=cloud_fs)
+        version_file.write_text(version)
+
+    # Each download is one latency-bound HTTPS round trip, so threads overlap them
+    if pending_downloads:
+        with ThreadPoolExecutor(max_workers=MAX_DOWNLOAD_WORKERS) as executor:
+            list(executor.map(download, pending_downloads))
+
+    # Drop partitions that are no longer published
+    for local_file in CLOUD_CACHE_PATH.rglob("*.parquet"):
+        if local_file not in synced_files:
+            local_file.unlink()
+            local_file.with_name(f".{local_file.name}.version").unlink(missing_ok=True)
+
+def read_gold_dataset(path, columns, coin_id=None, min_ts=None):
+    """
+    Reads the Hive-partitioned Gold dataset with projection and predicate pushdown.
+
+    The coin filter is evaluated against the 'coin_id=<id>' directory names, so
+    non-matching partitions are never opened. A single Parquet file (the unpartitioned
+    state file) is also accepted; coin_id is then filtered as a regular column. The time filter is checked against
+    the row-group statistics of 'source_updated_ts' (Gold writes rows sorted by time),
+    so row groups older than the cutoff are skipped. Only the requested columns are decoded.
+
+    Args:
+        path (Path | str): Root directory of the 'market_summary' dataset, or a single Parquet file.
+        columns (list[str]): The columns to decode.
+        coin_id (str, optional): Restricts the scan to a single asset. Defaults to all assets.
+        min_ts (int, optional): Oldest 'source_updated_ts' (epoch seconds) to keep. Defaults to all history.
+
+    Returns:
+        pd.DataFrame: The projected (and optionally filtered) rows.
+    """
+    partitioning = None if Path(path).is_file() else "hive"
+    dataset = ds.dataset(path, format="parquet", partitioning=partitioning)
+
+    row_filter = None
+    if coin_id:
+        row_filter = ds.field("coin_id") == coin_id
+    if min_ts is not None:
+        time_filter = ds.field(TS_COL) >= min_ts
+        row_filter = time_filter if row_filter is None else row_filter & time_filter
+
+    return dataset.to_table(columns=columns, filter=row_filter).to_pandas()
+
+@st.cache_data(ttl=600)
+def dataset_fingerprint(source_mode):
+    """
+    Identifies the current version of the 'Gold Layer' dataset for the selected source.
+
+    This cheap check (a directory stat, plus the mirror sync in CLOUD mode) is what
+    expires every 10 minutes; the decoded DataFrames in load_data are keyed on its
+    result and are only rebuilt when the files actually changed.
+
+    Args:
+        source_mode (str): The data origin ("LOCAL" or "CLOUD").
+
+    Returns:
+        tuple | None: (file count, newest mtime in ns) of the Gold Parquet files
+                      (dataset partitions and correlation matrix).
+                      Returns None if the dataset is missing or connection fails.
+    """
+    try:
+        if source_mode == "LOCAL":
+            local_source = get_local_gold_source()
+            if local_source is None:
+                return None
+            root = LOCAL_GOLD_DIR
+            files = [local_source] if local_source.is_file() else list(local_source.rglob("*.parquet"))
+        elif source_mode == "CLOUD" and CLOUD_BUCKET_NAME:
+            sync_cloud_dataset()
+            root = CLOUD_CACHE_DIR
+            files = list(CLOUD_CACHE_PATH.rglob("*.parquet"))
+        else:
+            return None
+
+        if (root / CORRELATION_FILENAME).exists():
+            files.append(root / CORRELATION_FILENAME)
+        mtimes = [path.stat().st_mtime_ns for path in files]
+    except Exception as error:
+        st.error(f"❌ Error checking the {source_mode.lower()} dataset: {error}")
+        return None
+
+    return (len(mtimes), max(mtimes)) if mtimes else None
+
+@st.cache_resource(max_entries=32)
+def load_data(source_mode, fingerprint, coin_id=None, columns=tuple(DASHBOARD_COLUMNS), days=HISTORY_DAYS):
+    """
+    Loads the 'Gold Layer' analytics data from the selected source.
 
-    return pd.DataFrame()
+    This function uses Streamlit's resource cache (@st.cache_resource), so a cache
+    hit hands back the same DataFrames by reference instead of unpickling a copy on
+    every rerun. Entries are keyed on the dataset fingerprint, which invalidates them
+    as soon as new Gold files land. Callers must treat the returned frames as read-only.
 
-# --- HELPER: METRIC FORMATTER ---
-def format_large_number(num):
+    The Gold dataset is Hive-partitioned by coin_id, so requesting a single asset
+    only reads that asset's partition instead of the whole market summary.
+
+    Args:
+        source_mode (str): The data origin.
+            - "LOCAL": Reads the 'market_summary' dataset from the local 'data/gold/' directory
+                       (or 'analyzed_market_summary.parquet' when the dataset is missing).
+                       Useful for development and backtesting results.
+            - "CLOUD": Reads the same dataset from the configured Google Cloud Storage bucket,
+                       through a version-checked local mirror (see sync_cloud_dataset).
+                       Useful for monitoring the live production pipeline.
+        fingerprint (tuple): The dataset version returned by dataset_fingerprint().
+        coin_id (str, optional): Restricts the read to a single asset partition. Defaults to all assets.
+        columns (tuple[str], optional): The columns to decode. Defaults to DASHBOARD_COLUMNS.
+        days (int, optional): How many days of history to load. Defaults to HISTORY_DAYS.
+                              If nothing is that recent, the last 'days' before the newest
+                              available row are loaded instead.
+
+    Returns:
+        tuple[pd.DataFrame, pd.DataFrame]:
+            - The historical market data sorted by time, enriched with financial
+              metrics (RSI, SMA, FDV, Volume).
+            - The latest row of every asset, indexed by coin_id (used for the KPI header).
+            Both are empty if the dataset cannot be read.
+    """
+    columns = list(columns)
+    df = pd.DataFrame()
+    root = get_local_gold_source() if source_mode == "LOCAL" else CLOUD_CACHE_PATH
+
+    try:
+        cutoff = int(time.time()) - days * 86_400
+        df = read_gold_dataset(root, columns, coin_id, min_ts=cutoff)
+        if df.empty:
+            # Stale dataset (nothing newer than the cutoff): anchor the window on the newest
+            # row instead of on today, so old data is still shown rather than nothing
+            df = read_gold_dataset(root, columns, coin_id)
+            if not df.empty and TS_COL in df.columns:
+                df = df[df[TS_COL] >= df[TS_COL].max() - days * 86_400]
+    except Exception as error:
+        st.error(f"❌ Error reading {source_mode.lower()} dataset: {error}")
+
+    # 3. Sort once per cache window and extract every asset's latest row in one pass
+    latest_per_coin = pd.DataFrame()
+    if not df.empty and TS_COL in df.columns:
+        df = df.sort_values(TS_COL).reset_index(drop=True)
+        df[TIME_COL] = pd.to_datetime(df[TS_COL], unit="s", utc=True)
+        if "coin_id" in df.columns:
+            df["coin_id"] = df["coin_id"].astype("category")
+            latest_per_coin = df.groupby("coin_id", observed=True).tail(1).set_index("coin_id")
+
+        # Downcast after the KPI rows are taken so the header keeps full precision
+        chart_columns = [col for col in CHART_COLUMNS if col in df.columns]
+        df[chart_columns] = df[chart_columns].astype("float32")
+
+    return df, latest_per_coin
+
+@st.cache_resource(max_entries=4)
+def load_correlation(source_mode, fingerprint):
     """
-    Formats large financial figures into human-readable strings (e.g., 1.5B, 200M).
+    Loads the cross-asset correlation matrix precomputed by the Gold layer.
 
-    Used specifically for high-value metrics like Market Cap, Fully Diluted Valuation (FDV),
-    and Trading Volume, where raw integers are difficult to scan quickly.
+    The Gold function correlates hourly mean prices of every asset pair on each run,
+    so the dashboard only reshapes a K x K table instead of aligning full histories.
 
     Args:
-        num (float): The raw number to format.
+        source_mode (str): The data origin ("LOCAL" or "CLOUD").
+        fingerprint (tuple): The dataset version returned by dataset_fingerprint().
 
     Returns:
-        str: A formatted string (e.g., '$1.25B', '$500.00M', or '$10,500').
-             Returns 'N/A' if the input is null/NaN.
+        pd.DataFrame: The (assets x assets) correlation matrix.
+                      Empty if the Gold layer has not published it yet.
     """
-    if pd.isna(num): return "N/A"
-    if num >= 1_000_000_000: return f"${num/1_000_000_000:.2f}B"
-    if num >= 1_000_000: return f"${num/1_000_000:.2f}M"
-    return f"${num:,.0f}"
+    root = LOCAL_GOLD_DIR if source_mode == "LOCAL" else CLOUD_CACHE_DIR
+    correlation_file = root / CORRELATION_FILENAME
+    if not correlation_file.exists():
+        return pd.DataFrame()
+
+    pairs = pd.read_parquet(correlation_file, engine="pyarrow")
+    return pairs.pivot(index="coin_a", columns="coin_b", values="rho").rename_axis(index=None, columns=None)
+
+# --- HELPER: CHARTS ---
+@st.cache_resource(max_entries=32)
+def build_charts(source_mode, fingerprint, coin_id, _coin_df):
+    """
+    Builds the Plotly figures for one asset.
+
+    Figure construction (and the downsampling feeding it) only depends on the
+    asset and the dataset version, so the figures are cached as resources and
+    reused on every rerun that doesn't change either. The DataFrame argument is
+    excluded from the cache key (leading underscore); the fingerprint identifies it.
+
+    Args:
+        source_mode (str): The data origin ("LOCAL" or "CLOUD").
+        fingerprint (tuple): The dataset version returned by dataset_fingerprint().
+        coin_id (str): The asset the figures are built for.
+        _coin_df (pd.DataFrame): The asset's time-sorted history from load_data().
+
+    Returns:
+        dict[str, plotly.graph_objects.Figure | None]: The 'price', 'rsi' and 'volume' figures
+                                     ('volume' is None if the column is missing).
+    """
+    # Imported here so the pre-data phase of a rerun (and LOCAL cold start) doesn't pay for Plotly
+    import plotly.graph_objects as go
+
+    time_col = TIME_COL
+
+    # Price & SMA Chart (downsampled on the price shape, SMA shares the same points).
+    # LTTB runs on the integer epoch key so no datetime column is converted.
+    keep = downsample_lttb(_coin_df[TS_COL].values, _coin_df['current_price'].values, MAX_CHART_POINTS)
+    chart_df = _coin_df.iloc[keep]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scattergl(x=chart_df[time_col], y=chart_df['current_price'], mode='lines+markers', name='Price', line=dict(color='#00CC96')))
+
+    if 'sma_7d' in chart_df.columns:
+        fig.add_trace(go.Scattergl(x=chart_df[time_col], y=chart_df['sma_7d'], mode='lines', name='SMA 7D', line=dict(color='#EF553B', dash='dash')))
+
+    fig.update_layout(template="plotly_dark", height=500, title=f"{coin_id.upper()} Price Trend")
+
+    # RSI Chart (downsampled on its own shape)
+    keep_rsi = downsample_lttb(_coin_df[TS_COL].values, _coin_df['rsi_14d'].values, MAX_CHART_POINTS)
+    rsi_df = _coin_df.iloc[keep_rsi]
+
+    fig_rsi = go.Figure()
+    fig_rsi.add_trace(go.Scattergl(x=rsi_df[time_col], y=rsi_df['rsi_14d'], mode='lines', name='RSI', line=dict(color='#AB63FA')))
+    fig_rsi.add_hline(y=70, line_dash="dot", line_color="red")
+    fig_rsi.add_hline(y=30, line_dash="dot", line_color="#00CC96")
+    fig_rsi.update_layout(template="plotly_dark", height=250, yaxis=dict(range=[0, 100]), title="Momentum (RSI)")
+
+    # Volume Chart
+    fig_vol = None
+    if 'total_volume' in _coin_df.columns:
+        fig_vol = go.Figure()
+        fig_vol.add_trace(go.Bar(x=_coin_df[time_col], y=_coin_df['total_volume'], name='Volume', marker_color='#636EFA'))
+        fig_vol.update_layout(template="plotly_dark", height=400, title="24h Trading Volume")
+
+    return {"price": fig, "rsi": fig_rsi, "volume": fig_vol}
 
 # --- MAIN APP ---
 def main():
@@ -125,31 +440,42 @@ def main():
     else:
         st.sidebar.info(f"🏠 Mode: Local Disk")
 
-    # Load Data
-    df = load_data(data_source)
+    # Sidebar: Asset Selection (partition listing only, no data read yet)
+    all_coins = list_assets(data_source)
 
-    if df.empty:
+    if not all_coins:
         st.warning("⚠️ No data loaded. Run the pipeline first.")
         return
 
-    # Ensure Timestamp Column Exists
-    time_col = 'source_updated_at'
-    if time_col not in df.columns:
-        st.error(f"❌ Critical: Missing '{time_col}' in dataset.")
+    coin_col = 'coin_id'
+    selected_coin = st.sidebar.selectbox("Select Asset", all_coins, index=0)
+
+    # Load Data (only the selected asset's partition, already sorted by time)
+    fingerprint = dataset_fingerprint(data_source)
+    if fingerprint is None:
+        st.warning("⚠️ No data loaded. Run the pipeline first.")
         return
 
-    # Convert & Sort
-    df[time_col] = pd.to_datetime(df[time_col])
-    df = df.sort_values(time_col)
+    coin_df, latest_per_coin = load_data(data_source, fingerprint, coin_id=selected_coin)
 
-    # Sidebar: Asset Selection
-    coin_col = 'symbol' if 'symbol' in df.columns else 'coin_id'
-    all_coins = df[coin_col].unique()
-    selected_coin = st.sidebar.selectbox("Select Asset", all_coins, index=0)
+    if coin_df.empty:
+        st.warning("⚠️ No data loaded. Run the pipeline first.")
+        return
+
+    # load_data falls back to the newest rows when nothing is recent; say so explicitly
+    newest_ts = coin_df[TS_COL].max() if TS_COL in coin_df.columns else None
+    if newest_ts is not None and newest_ts < time.time() - HISTORY_DAYS * 86_400:
+        newest_date = pd.to_datetime(newest_ts, unit="s", utc=True).strftime("%Y-%m-%d")
+        st.warning(f"⚠️ Showing stale data: the latest record is from {newest_date}, older than {HISTORY_DAYS} days. Run the pipeline to refresh it.")
+
+    # Ensure Timestamp Column Exists
+    time_col = TIME_COL
+    if time_col not in coin_df.columns:
+        st.error(f"❌ Critical: Missing '{time_col}' in dataset.")
+        return
 
-    # Filter Data
-    coin_df = df[df[coin_col] == selected_coin].copy()
-    latest = coin_df.iloc[-1]
+    # Plain dict of the KPI row: every .get() below is a dict lookup, not Series indexing
+    latest = latest_per_coin.loc[selected_coin].to_dict()
 
 # --- 1. ASSET HEADER (RICH METRICS) ---
     st.markdown("---")
@@ -199,8 +525,9 @@ def main():
         st.metric("RSI (14d)", f"{rsi:.1f}", "Overbought > 70" if rsi > 70 else "Oversold < 30" if rsi < 30 else "Neutral", delta_color="off")
 
     with col3:
-        volatility = latest.get('volatility_7d', 0)
-        st.metric("Volatility (7d)", f"{volatility:.2f}")
+        # STDDEV_SAMP is NULL for a coin's first row, so a present key can still hold NaN
+        volatility = latest.get('volatility_7d')
+        st.metric("Volatility (7d)", f"{volatility:.2f}" if pd.notna(volatility) else "N/A")
 
     with col4:
         # Market Cap vs FDV
@@ -215,45 +542,31 @@ def main():
     st.markdown("---")
     tab1, tab2 = st.tabs(["📈 Price Action", "📊 Volume & Supply"])
 
-    with tab1:
-        # Price & SMA Chart
-        fig = go.Figure()
-        fig.add_trace(go.Scatter(x=coin_df[time_col], y=coin_df['current_price'], mode='lines+markers', name='Price', line=dict(color='#00CC96')))
-
-        if 'sma_7d' in coin_df.columns:
-            fig.add_trace(go.Scatter(x=coin_df[time_col], y=coin_df['sma_7d'], mode='lines', name='SMA 7D', line=dict(color='#EF553B', dash='dash')))
+    # Figures are built once per (asset, dataset version) and reused across reruns
+    figures = build_charts(data_source, fingerprint, selected_coin, coin_df)
 
-        fig.update_layout(template="plotly_dark", height=500, title=f"{selected_coin.upper()} Price Trend")
-        st.plotly_chart(fig, use_container_width=True)
-
-        # RSI Chart
-        fig_rsi = go.Figure()
-        fig_rsi.add_trace(go.Scatter(x=coin_df[time_col], y=coin_df['rsi_14d'], mode='lines', name='RSI', line=dict(color='#AB63FA')))
-        fig_rsi.add_hline(y=70, line_dash="dot", line_color="red")
-        fig_rsi.add_hline(y=30, line_dash="dot", line_color="#00CC96")
-        fig_rsi.update_layout(template="plotly_dark", height=250, yaxis=dict(range=[0, 100]), title="Momentum (RSI)")
-        st.plotly_chart(fig_rsi, use_container_width=True)
+    with tab1:
+        st.plotly_chart(figures["price"], use_container_width=True)
+        st.plotly_chart(figures["rsi"], use_container_width=True)
 
     with tab2:
-        # Volume Chart
-        if 'total_volume' in coin_df.columns:
-            fig_vol = go.Figure()
-            fig_vol.add_trace(go.Bar(x=coin_df[time_col], y=coin_df['total_volume'], name='Volume', marker_color='#636EFA'))
-            fig_vol.update_layout(template="plotly_dark", height=400, title="24h Trading Volume")
-            st.plotly_chart(fig_vol, use_container_width=True)
+        if figures["volume"] is not None:
+            st.plotly_chart(figures["volume"], use_container_width=True)
         else:
             st.info("Volume data not available.")
 
     # --- 4. CORRELATION MATRIX ---
     st.markdown("### 🔥 Market Correlation")
     try:
-        # Pivot Data for Correlation
-        pivot_df = df.pivot_table(index=time_col, columns=coin_col, values='current_price')
-        # Resample to Hourly to align timestamps and handle gaps
-        pivot_df = pivot_df.resample('h').mean().ffill().bfill()
+        corr = load_correlation(data_source, fingerprint)
+
+        # Bound the styled table to the top assets by market cap rank
+        if len(corr) > MAX_HEATMAP_ASSETS:
+            _, latest_ranks = load_data(data_source, fingerprint, columns=(TS_COL, coin_col, 'market_cap_rank'))
+            top_coins = latest_ranks.nsmallest(MAX_HEATMAP_ASSETS, 'market_cap_rank').index
+            corr = corr.loc[corr.index.isin(top_coins), corr.columns.isin(top_coins)]
 
-        if len(pivot_df.columns) > 1:
-            corr = pivot_df.corr()
+        if len(corr) > 1:
             st.dataframe(corr.style.background_gradient(cmap="RdYlGn", vmin=-1, vmax=1).format("{:.2f}"), use_container_width=True)
         else:
             st.info("Need more than 1 asset to calculate correlation.")
@@ -262,7 +575,8 @@ def main():
 
     # --- RAW DATA ---
     with st.expander("📂 View Raw Data"):
-        st.dataframe(coin_df.sort_values(time_col, ascending=False))
+        # coin_df is already time-sorted by load_data; a reversed view shows newest first without a re-sort copy
+        st.dataframe(coin_df.iloc[::-1])
 
 if __name__ == "__main__":
     main()
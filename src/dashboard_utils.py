@@ -0,0 +1,85 @@
+"""
+Pure helpers for the Streamlit dashboard (src/dashboard.py).
+
+Nothing in here touches Streamlit, the filesystem or the network, so these
+functions can be imported and tested without starting the app.
+
+Key Features:
+- Metric Formatting: Human-readable market cap / FDV / volume strings.
+- Chart Downsampling: Largest-Triangle-Three-Buckets (LTTB) point selection.
+"""
+
+import bisect
+import numpy as np
+import pandas as pd
+
+# --- METRIC FORMATTER ---
+# Suffix table for format_large_number, ascending. Values below the first threshold
+# are printed in full; the lookup is a binary search instead of an if/elif chain.
+LARGE_NUMBER_SCALES = [(1_000_000, "M"), (1_000_000_000, "B")]
+LARGE_NUMBER_THRESHOLDS = [divisor for divisor, _ in LARGE_NUMBER_SCALES]
+
+def format_large_number(num):
+    """
+    Formats large financial figures into human-readable strings (e.g., 1.5B, 200M).
+
+    Used specifically for high-value metrics like Market Cap, Fully Diluted Valuation (FDV),
+    and Trading Volume, where raw integers are difficult to scan quickly.
+
+    Args:
+        num (float): The raw number to format.
+
+    Returns:
+        str: A formatted string (e.g., '$1.25B', '$500.00M', or '$10,500').
+             Returns 'N/A' if the input is null/NaN.
+    """
+    if pd.isna(num): return "N/A"
+    scale = bisect.bisect_right(LARGE_NUMBER_THRESHOLDS, num)
+    if scale == 0: return f"${num:,.0f}"
+    divisor, suffix = LARGE_NUMBER_SCALES[scale - 1]
+    return f"${num/divisor:.2f}{suffix}"
+
+# --- CHART DOWNSAMPLING ---
+def downsample_lttb(x, y, n_out=2000):
+    """
+    Selects the visually significant points of a series (Largest-Triangle-Three-Buckets).
+
+    Plotly ships every point to the browser as JSON, so long histories make the
+    charts slow to serialize and render. LTTB keeps the first and last points and,
+    for every bucket in between, the point forming the largest triangle with the
+    previously kept point and the average of the next bucket. Peaks and troughs survive.
+
+    Args:
+        x (np.ndarray): The x values, e.g. epoch seconds (datetimes are compared as int64 nanoseconds).
+        y (np.ndarray): The y values.
+        n_out (int, optional): The number of points to keep. Defaults to 2000.
+
+    Returns:
+        np.ndarray: The sorted row positions to keep (all rows if the series is already short).
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype(np.int64)
+    x = x.astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    keep = np.empty(n_out, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        keep[i + 1] = a
+
+    return keep
@@ -1,15 +1,127 @@
 import requests
 import websocket
+import io
 import json
+import math
+import os
+import orjson
+import queue
+import random
+import threading
 import time
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Set, Tuple
+from tqdm import tqdm
 
 from .base_ingestor import BaseIngestor
-from .config import CRYPTO_PAIRS, BINANCE_CONFIG
+from .config import (
+    CRYPTO_PAIRS, BINANCE_CONFIG, BINANCE_CONCURRENCY, BINANCE_RATE_LIMIT, DOWNLOAD_WORKERS,
+    HTTP_CONFIG, WS_RECONNECT_CONFIG, WS_SHARD_SIZE
+)
+from .http_session import AIMDLimiter, TokenBucket, build_session, retry_after_seconds
 from src.utils.logger import get_logger
 
+# Pre-bound CSV row template for the live buffer: symbol, open time, open, high, low, close, volume
+_KLINE_ROW = "{},{},{},{},{},{},{}\n".format
+
+# The terminal status line is refreshed at most 10 times per second, not once per kline
+LIVE_STATUS_INTERVAL: float = 0.1
+
+def _month_range(start: Tuple[int, int] = (2017, 8)) -> Iterator[Tuple[str, str]]:
+    """
+    Yields every ('YYYY', 'MM') pair from 'start' up to the last fully closed month.
+
+    Binance Vision's spot klines begin in August 2017, and a monthly archive only exists
+    once its month is over (the current month is covered by 'ingest_recent').
+
+    Args:
+        start (Tuple[int, int], optional): The first (year, month) to yield. Defaults to (2017, 8).
+
+    Yields:
+        Tuple[str, str]: Zero-padded (year, month) strings ready for URL construction.
+    """
+    today: datetime = datetime.now(timezone.utc)
+    year, month = start
+    while (year, month) < (today.year, today.month):
+        yield f"{year}", f"{month:02d}"
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+# Past this many consecutive failures the exponential term already exceeds MAX_DELAY_SECONDS,
+# so the attempt counter stops growing there (2 ** attempts can never overflow a float)
+_RECONNECT_MAX_EXPONENT: int = math.ceil(math.log2(WS_RECONNECT_CONFIG["MAX_DELAY_SECONDS"]))
+
+def _reconnect_delay(attempts: int) -> float:
+    """
+    Computes the wait before the next WebSocket reconnect.
+
+    The exponential base (1s, 2s, 4s ...) is clamped to MAX_DELAY_SECONDS first and up to 1s
+    of random jitter is added afterwards, so shards that have all hit the cap still spread
+    their reconnects out instead of retrying in lockstep.
+
+    Args:
+        attempts (int): Consecutive failed connections so far (any non-negative number).
+
+    Returns:
+        float: Seconds to wait, between 2 ** attempts and MAX_DELAY_SECONDS + 1.
+    """
+    base: float = min(WS_RECONNECT_CONFIG["MAX_DELAY_SECONDS"], 2 ** min(attempts, _RECONNECT_MAX_EXPONENT))
+    return base + random.uniform(0, 1)
+
+class _KlineBuffer:
+    """
+    The append-only live buffer file, shared by every WebSocket shard.
+
+    Receive threads only enqueue encoded rows, which never blocks. A dedicated writer
+    thread drains the queue in batches, writes each batch with a single call and flushes
+    it, waking up at least every 'flush_interval' seconds. If the disk stalls long enough
+    for 'max_pending' rows to pile up, new rows are dropped (and counted) instead of
+    blocking the WebSocket receive loop, since Binance disconnects slow consumers.
+    """
+
+    def __init__(self, path: Path, flush_interval: float = 1.0, max_pending: int = 8192) -> None:
+        self._file: BinaryIO = open(path, "ab", buffering=1 << 16)
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=max_pending)
+        self._flush_interval: float = flush_interval
+        self.dropped: int = 0
+
+        self._writer = threading.Thread(target=self._drain, name="kline-writer", daemon=True)
+        self._writer.start()
+
+    def write(self, row: bytes) -> None:
+        # Enqueues one encoded CSV row without ever blocking the caller.
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        # Stops the writer once everything queued so far is on disk.
+        self._queue.put(None)
+        self._writer.join()
+        self._file.close()
+
+    def _drain(self) -> None:
+        # Writer thread: one write() + flush() per batch of queued rows; None is the stop signal.
+        while True:
+            try:
+                rows: List[Optional[bytes]] = [self._queue.get(timeout=self._flush_interval)]
+            except queue.Empty:
+                continue
+            while True:
+                try:
+                    rows.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop: bool = rows[-1] is None
+            self._file.write(b"".join(row for row in rows if row is not None))
+            self._file.flush()
+            if stop:
+                return
+
 class BinanceIngestor(BaseIngestor):
     """
     The Concrete Implementation for Cryptocurrency Ingestion via Binance.
@@ -28,76 +140,266 @@ class BinanceIngestor(BaseIngestor):
         # Initialize the Observer-based Logger
         self.log = get_logger("BinanceIngestor")
 
+        # One pooled session shared by every download worker (reuses TCP+TLS connections)
+        self.session = build_session(pool_size=DOWNLOAD_WORKERS)
+
+        # Validation manifest of the archive folder being synced ({filename: [size, mtime_ns]})
+        self._validated: Dict[str, List[int]] = {}
+
+        # Last time the live status line was printed (shared by all stream shards)
+        self._last_status: float = 0.0
+
+        # Shared request budget: every worker takes a token before each GET
+        self._bucket = TokenBucket(
+            rate=BINANCE_RATE_LIMIT["REQUESTS_PER_MINUTE"] / 60,
+            burst=BINANCE_RATE_LIMIT["BURST"]
+        )
+
+        # Adaptive in-flight limit below the thread-pool ceiling (backs off under congestion)
+        self._concurrency = AIMDLimiter(
+            initial=int(BINANCE_CONCURRENCY["INITIAL_WORKERS"]),
+            minimum=int(BINANCE_CONCURRENCY["MIN_WORKERS"]),
+            maximum=DOWNLOAD_WORKERS,
+            target_latency=BINANCE_CONCURRENCY["TARGET_LATENCY_SECONDS"]
+        )
+
     def _is_valid_zip(self, file_path: Path) -> bool:
         # Checks if a file is a valid, non-empty Zip archive.
-        if not file_path.exists():
+        # Files whose (size, mtime) still match the validation manifest skip the central-directory parse.
+        try:
+            st = file_path.stat()
+        except FileNotFoundError:
             return False
-        if file_path.stat().st_size == 0:
+        if st.st_size == 0:
             return False
+        if self._validated.get(file_path.name) == [st.st_size, st.st_mtime_ns]:
+            return True
         if not zipfile.is_zipfile(file_path):
             return False
+        self._validated[file_path.name] = [st.st_size, st.st_mtime_ns]
         return True
 
+    def _remember_valid(self, file_path: Path) -> None:
+        # Records a freshly written (already verified) archive in the validation manifest.
+        st = file_path.stat()
+        self._validated[file_path.name] = [st.st_size, st.st_mtime_ns]
+
+    def _load_manifest(self, manifest_file: Path) -> Dict[str, List[int]]:
+        # Loads the {filename: [size, mtime_ns]} map of archives verified on previous runs.
+        if not manifest_file.exists():
+            return {}
+        try:
+            with open(manifest_file, "r") as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            self.log.warning(f"Corrupt manifest found: {manifest_file.name}. Re-validating all archives.")
+            return {}
+
+    def _save_manifest(self, manifest_file: Path) -> None:
+        # Persists the validation manifest (compact: it holds one entry per archive on disk).
+        with open(manifest_file, "w") as f:
+            json.dump(self._validated, f)
+
+    def _scan_coin_dir(self, dest_dir: Path, symbol: str) -> Tuple[Path, Set[str]]:
+        # Provisions the asset folder and lists its files once (one scandir instead of a stat per file).
+        coin_dir: Path = dest_dir / symbol.replace("USDT", "").lower()
+        coin_dir.mkdir(parents=True, exist_ok=True)
+        with os.scandir(coin_dir) as entries:
+            return coin_dir, {entry.name for entry in entries}
+
+    def _needs_download(self, save_path: Path) -> bool:
+        # Hardening: Skips files already secured and purges corrupt/empty leftovers.
+        if not save_path.exists():
+            return True
+        if self._is_valid_zip(save_path):
+            return False
+        self.log.warning(f"Found corrupt/empty file: {save_path.name}. Deleting.")
+        save_path.unlink()
+        return True
+
+    def _persist_archive(self, resp: requests.Response, save_path: Path) -> bool:
+        """
+        Writes a 200 response body to disk only if it is a valid Zip archive.
+
+        Archives with a known size up to 'IN_MEMORY_MAX_BYTES' (virtually every Binance
+        Vision file) are buffered in RAM and checked there, so a corrupt body never costs a
+        disk write + unlink and a good one is persisted with a single write. Larger or
+        unsized bodies keep the streaming path (write to disk, then verify) to bound memory.
+
+        Args:
+            resp (requests.Response): The streamed response with status 200.
+            save_path (Path): The final destination of the archive.
+
+        Returns:
+            bool: True if the archive was persisted, False if it was corrupt and discarded.
+        """
+        size: int = int(resp.headers.get("Content-Length") or 0)
+
+        if 0 < size <= HTTP_CONFIG["IN_MEMORY_MAX_BYTES"]:
+            body = io.BytesIO()
+            for chunk in resp.iter_content(chunk_size=HTTP_CONFIG["CHUNK_SIZE"]):
+                body.write(chunk)
+            if not zipfile.is_zipfile(body):
+                return False
+            save_path.write_bytes(body.getbuffer())
+            self._remember_valid(save_path)
+            return True
+
+        with open(save_path, "wb") as f:
+            for chunk in resp.iter_content(chunk_size=HTTP_CONFIG["CHUNK_SIZE"]):
+                f.write(chunk)
+        if not self._is_valid_zip(save_path):
+            save_path.unlink()
+            return False
+        return True
+
+    def _download_one(self, job: Tuple[str, Path, str]) -> Optional[int]:
+        """
+        Downloads a single Binance Vision archive and verifies its integrity.
+
+        Safe to call from several worker threads at once. Every request first takes a token
+        from the shared bucket, which keeps the whole pool under Binance's request budget.
+        If Binance still answers with a rate-limit status (429/418), the bucket is paused
+        for as long as the 'Retry-After' header asks (5 minutes if absent), so every
+        worker backs off together. The AIMD limiter additionally sizes how many requests
+        are in flight from the observed header latency and error rate.
+
+        Args:
+            job (Tuple[str, Path, str]): The (url, save_path, not_found_hint) triple,
+                                         where the hint explains a 404 in the log.
+
+        Returns:
+            Optional[int]: The HTTP status code, or None if the request never completed.
+        """
+        url, save_path, not_found_hint = job
+        filename: str = save_path.name
+
+        # Respect the shared request budget (and any cool-down triggered by another worker)
+        self._bucket.acquire()
+        self._concurrency.acquire()
+        latency: Optional[float] = None
+        healthy: bool = False
+
+        # Download Logic with Smart HTTP Handling
+        try:
+            # stream=True: the body is read chunk by chunk (never as one resp.content copy)
+            started: float = time.perf_counter()
+            with self.session.get(url, stream=True, timeout=HTTP_CONFIG["TIMEOUT"]) as resp:
+                # With stream=True get() returns once the headers arrive: a clean server-latency sample
+                latency = time.perf_counter() - started
+                healthy = resp.status_code not in [429, 418] and resp.status_code < 500
+
+                if resp.status_code == 200:
+                    if self._persist_archive(resp, save_path):
+                        self.log.info("Secured: %s", filename)
+                    else:
+                        self.log.error(f"Integrity Check Failed (Discarded): {filename}")
+
+                elif resp.status_code == 404:
+                    self.log.warning(f"404 Not Found: {filename} ({not_found_hint})")
+
+                elif resp.status_code in [429, 418]:
+                    cooldown: float = retry_after_seconds(resp, default=300)
+                    self.log.error(f"Rate Limit Exceeded / IP Banned by Binance! Pausing all downloads for {cooldown:.0f}s.")
+                    self._bucket.pause(cooldown) # Let the ban lift
+
+                else:
+                    self.log.error(f"Unexpected HTTP {resp.status_code} for {filename}")
+
+                return resp.status_code
+
+        except Exception as error:
+            # A stream cut mid-transfer leaves a truncated archive behind; never keep it
+            save_path.unlink(missing_ok=True)
+            self.log.error(f"Network Error during download: {error}")
+            healthy = False
+            return None
+
+        finally:
+            self._concurrency.release(latency, healthy)
+
+    def _download_all(self, jobs: List[Tuple[str, Path, str]]) -> List[Optional[int]]:
+        # Dispatches the queued downloads through a bounded thread pool (the work is network-bound).
+        # Returns the status code of every job, in the same order as 'jobs'.
+        if not jobs:
+            self.log.info("All archives already secured. Nothing to download.")
+            return []
+
+        self.log.info(f"Downloading {len(jobs)} archives with {DOWNLOAD_WORKERS} workers.")
+        with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as executor:
+            results = executor.map(self._download_one, jobs)
+            return list(tqdm(results, total=len(jobs), unit="file", desc="Downloading"))
+
+    def _load_not_found(self, registry_file: Path) -> Set[str]:
+        # Loads the filenames Binance has already confirmed as non-existent (Resume Capability).
+        if not registry_file.exists():
+            return set()
+        try:
+            with open(registry_file, "r") as f:
+                return set(json.load(f))
+        except json.JSONDecodeError:
+            self.log.warning(f"Corrupt registry found: {registry_file.name}. Starting fresh.")
+            return set()
+
     def ingest_historical(self) -> None:
         """
         Downloads monthly 1-minute kline archives (Zip format) from Binance Vision.
 
-        Range: July 2017 to Present.
+        Range: August 2017 to the last closed month.
         """
         self.log.info(f"Initiating Deep Historical Backfill for {len(self.pairs)} assets.")
         dest_dir: Path = self.base_path / "historical_monthly"
+        dest_dir.mkdir(parents=True, exist_ok=True)
+
+        # Archives that returned 404 for a month that is already closed will never appear
+        # (the asset simply wasn't listed yet), so I remember them and stop re-probing each run.
+        # The last closed month is excluded: Binance publishes it a few days into the next one.
+        registry_file: Path = dest_dir / ".not_found.json"
+        known_missing: Set[str] = self._load_not_found(registry_file)
+
+        # Archives verified on earlier runs are trusted while their size and mtime are unchanged
+        manifest_file: Path = dest_dir / ".validated.json"
+        self._validated = self._load_manifest(manifest_file)
+        last_closed_month: datetime = datetime.now(timezone.utc).replace(day=1) - timedelta(days=1)
+        settled_before: str = last_closed_month.strftime("%Y-%m")
+
+        # The month list and URL pieces are the same for every asset, so I build them once
+        interval: str = self.config['INTERVAL']
+        periods: List[str] = [f"{year}-{month}" for year, month in _month_range()]
+
+        # 1. Queue every archive that isn't already secured on disk
+        jobs: List[Tuple[str, Path, str]] = []
+        for symbol in self.pairs:
+            coin_dir, on_disk = self._scan_coin_dir(dest_dir, symbol)
+            url_prefix: str = f"{self.config['MONTHLY_URL']}/{symbol}/{interval}/"
 
-        years: list[str] = ["2017", "2018", "2019", "2020", "2021", "2022", "2023", "2024", "2025", "2026"]
-        months: list[str] = [f"{i:02d}" for i in range(1, 13)]
+            self.log.info("Scanning archives for %s.", symbol)
+            for period in periods:
+                filename: str = f"{symbol}-{interval}-{period}.zip"
+                if filename in known_missing:
+                    continue
 
-        for symbol in self.pairs:
-            coin_dir: Path = dest_dir / symbol.replace("USDT", "").lower()
-            coin_dir.mkdir(parents=True, exist_ok=True)
-
-            self.log.info(f"Scanning archives for {symbol}.")
-            for year in years:
-                for month in months:
-                    if year == "2017" and int(month) < 8:
-                        continue
-
-                    filename: str = f"{symbol}-{self.config['INTERVAL']}-{year}-{month}.zip"
-                    url: str = f"{self.config['MONTHLY_URL']}/{symbol}/{self.config['INTERVAL']}/{filename}"
-                    save_path: Path = coin_dir / filename
-
-                    # Hardening: Check existing file integrity
-                    if save_path.exists():
-                        if self._is_valid_zip(save_path):
-                            continue
-                        else:
-                            self.log.warning(f"Found corrupt/empty file: {filename}. Deleting.")
-                            save_path.unlink()
-
-                    # Download Logic with Smart HTTP Handling
-                    try:
-                        resp = requests.get(url)
-
-                        if resp.status_code == 200:
-                            with open(save_path, "wb") as f:
-                                f.write(resp.content)
-
-                            if not self._is_valid_zip(save_path):
-                                save_path.unlink()
-                                self.log.error(f"Integrity Check Failed (Deleted): {filename}")
-                            else:
-                                self.log.info(f"Secured: {filename}")
-
-                        elif resp.status_code == 404:
-                            self.log.warning(f"404 Not Found: {filename} (Asset likely unlisted at this time)")
-
-                        elif resp.status_code in [429, 418]:
-                            self.log.error("Rate Limit Exceeded / IP Banned by Binance! Sleeping for 5 minutes.")
-                            time.sleep(300) # Sleep for 5 minutes to let the ban lift
-
-                        else:
-                            self.log.error(f"Unexpected HTTP {resp.status_code} for {filename}")
-
-                    except Exception as error:
-                        self.log.error(f"Network Error during download: {error}")
+                save_path: Path = coin_dir / filename
+
+                # Only files present in the listing need the integrity check
+                if filename not in on_disk or self._needs_download(save_path):
+                    jobs.append((url_prefix + filename, save_path, "Asset likely unlisted at this time"))
+
+        # 2. Download them concurrently
+        statuses: List[Optional[int]] = self._download_all(jobs)
+        self._save_manifest(manifest_file)
+
+        # 3. Remember the settled months that definitively do not exist
+        new_missing: Set[str] = {
+            save_path.name
+            for (_, save_path, _), status in zip(jobs, statuses)
+            if status == 404 and save_path.stem[-7:] < settled_before
+        }
+        if new_missing:
+            known_missing |= new_missing
+            with open(registry_file, "w") as f:
+                json.dump(sorted(known_missing), f, indent=4)
+            self.log.info(f"Registered {len(new_missing)} unlisted archives in {registry_file.name} (skipped on future runs).")
 
     def ingest_recent(self) -> None:
         """
@@ -107,89 +409,146 @@ class BinanceIngestor(BaseIngestor):
         """
         self.log.info("Synchronizing Recent Daily Data.")
         dest_dir: Path = self.base_path / "recent_daily"
+        dest_dir.mkdir(parents=True, exist_ok=True)
+
+        # Archives verified on earlier runs are trusted while their size and mtime are unchanged
+        manifest_file: Path = dest_dir / ".validated.json"
+        self._validated = self._load_manifest(manifest_file)
 
         today: datetime = datetime.now(timezone.utc)
         start_date: datetime = today.replace(day=1)
         end_date: datetime = today - timedelta(days=1)
 
-        dates: list[datetime] = []
+        # Formatted once, shared by every asset
+        interval: str = self.config['INTERVAL']
+        date_strs: List[str] = []
         curr: datetime = start_date
         while curr <= end_date:
-            dates.append(curr)
+            date_strs.append(curr.strftime("%Y-%m-%d"))
             curr += timedelta(days=1)
 
+        # 1. Queue every daily file that isn't already secured on disk
+        jobs: List[Tuple[str, Path, str]] = []
         for symbol in self.pairs:
-            coin_dir: Path = dest_dir / symbol.replace("USDT", "").lower()
-            coin_dir.mkdir(parents=True, exist_ok=True)
+            coin_dir, on_disk = self._scan_coin_dir(dest_dir, symbol)
+            url_prefix: str = f"{self.config['DAILY_URL']}/{symbol}/{interval}/"
 
-            for d in dates:
-                date_str: str = d.strftime("%Y-%m-%d")
-                filename: str = f"{symbol}-{self.config['INTERVAL']}-{date_str}.zip"
-                url: str = f"{self.config['DAILY_URL']}/{symbol}/{self.config['INTERVAL']}/{filename}"
+            for date_str in date_strs:
+                filename: str = f"{symbol}-{interval}-{date_str}.zip"
                 save_path: Path = coin_dir / filename
 
-                if save_path.exists():
-                    if self._is_valid_zip(save_path):
-                        continue
-                    else:
-                        self.log.warning(f"Found corrupt/empty daily file: {filename}. Deleting.")
-                        save_path.unlink()
+                # Only files present in the listing need the integrity check
+                if filename not in on_disk or self._needs_download(save_path):
+                    jobs.append((url_prefix + filename, save_path, "Data pending from Binance"))
 
-                try:
-                    resp = requests.get(url)
-                    if resp.status_code == 200:
-                        with open(save_path, "wb") as f:
-                            f.write(resp.content)
+        # 2. Download them concurrently
+        self._download_all(jobs)
+        self._save_manifest(manifest_file)
+
+    def _run_stream(self, shard_id: int, pairs: List[str], buffer: "_KlineBuffer",
+                    stop: threading.Event, sockets: Dict[int, websocket.WebSocketApp]) -> None:
+        """
+        Keeps one combined-stream WebSocket connection alive for a subset of the pairs.
+
+        Runs on its own thread (one per shard) until 'stop' is set, reconnecting with a
+        jittered exponential backoff after every disconnect.
+
+        Args:
+            shard_id (int): The index of this shard, used in logs and as the key in 'sockets'.
+            pairs (List[str]): The symbols owned by this connection.
+            buffer (_KlineBuffer): The buffer file shared by all shards.
+            stop (threading.Event): Set by the orchestrator to end the stream.
+            sockets (Dict[int, websocket.WebSocketApp]): Registry of live sockets, so the
+                                                         orchestrator can close them on shutdown.
+        """
+        # Subscribing through the combined-stream URL means the server starts pushing klines
+        # on the first frame: no SUBSCRIBE round-trip (or its ACK) on every (re)connect
+        stream_path: str = "/".join(f"{c.lower()}@kline_1m" for c in pairs)
+        stream_url: str = f"{self.config['WS_URL']}?streams={stream_path}"
+
+        # Consecutive failed connections; reset as soon as a connection opens
+        reconnect_attempts: int = 0
 
-                        if not self._is_valid_zip(save_path):
-                            save_path.unlink()
-                            self.log.error(f"Integrity Check Failed for daily file: {filename}")
-                        else:
-                            self.log.info(f"Secured Daily: {filename}")
+        def on_open(_ws: websocket.WebSocketApp) -> None:
+            nonlocal reconnect_attempts
+            self.log.info(f"WebSocket Connected successfully (shard {shard_id}, {len(pairs)} pairs).")
+            reconnect_attempts = 0
+
+        def on_message(_ws: websocket.WebSocketApp, message: str) -> None:
+            # orjson's C parser is several times faster than json.loads on these small payloads
+            data = orjson.loads(message).get("data", {})
+            if 'k' in data and data['k']['x']:
+                k = data['k']
+                # Binance sends these fields as ASCII strings/ints, so the cheap ascii codec is safe
+                buffer.write(_KLINE_ROW(k['s'], k['t'], k['o'], k['h'], k['l'], k['c'], k['v']).encode("ascii"))
+                # I use print here instead of logger to prevent the log file from growing to 10GB
+                now: float = time.monotonic()
+                if now - self._last_status >= LIVE_STATUS_INTERVAL:
+                    self._last_status = now
+                    print(f"  💾 Captured: {k['s']} @ {k['c']}     ", end="\r")
 
-                    elif resp.status_code == 404:
-                        self.log.warning(f"404 Not Found: {filename} (Data pending from Binance)")
+        while not stop.is_set():
+            try:
+                ws = websocket.WebSocketApp(stream_url, on_open=on_open, on_message=on_message)
+                sockets[shard_id] = ws
+                # websocket-client validates every incoming text frame with a pure-Python UTF-8
+                # state machine; orjson already rejects malformed payloads, so I skip that pass
+                ws.run_forever(skip_utf8_validation=True)
+            except Exception as error:
+                self.log.error(f"WebSocket Error (shard {shard_id}): {error}.")
 
-                    elif resp.status_code in [429, 418]:
-                        self.log.error("Rate Limit Exceeded! Sleeping for 5 minutes.")
-                        time.sleep(300)
+            if stop.is_set():
+                break
 
-                except Exception as error:
-                    self.log.error(f"Network Error: {error}")
+            # run_forever() also returns normally when the socket drops, so every disconnect
+            # goes through the same jittered exponential backoff before reconnecting
+            delay: float = _reconnect_delay(reconnect_attempts)
+            reconnect_attempts = min(reconnect_attempts + 1, _RECONNECT_MAX_EXPONENT)
+            self.log.warning(f"WebSocket disconnected (shard {shard_id}). Reconnecting in {delay:.1f} seconds.")
+            stop.wait(delay)
 
     def ingest_live(self) -> None:
         """
         Connects to the Binance WebSocket Stream to capture real-time market data.
 
         Output: Appends row-based CSV data to a local buffer file.
+
+        Binance caps the number of streams per connection, so the pairs are split into
+        shards of WS_SHARD_SIZE and each shard gets its own connection thread. The shards
+        only enqueue rows; a single writer thread appends them to the buffer file in batches,
+        so a slow disk never stalls a WebSocket receive loop.
         """
         self.log.info("Establishing Real-Time WebSocket Connection.")
         buffer_file: Path = self.base_path / "live_buffer" / "stream_buffer.csv"
         buffer_file.parent.mkdir(parents=True, exist_ok=True)
 
-        def on_open(_ws: websocket.WebSocketApp) -> None:
-            self.log.info("WebSocket Connected successfully.")
-            params = [f"{c.lower()}@kline_1m" for c in self.pairs]
-            _ws.send(json.dumps({"method": "SUBSCRIBE", "params": params, "id": 1}))
-
-        def on_message(_ws: websocket.WebSocketApp, message: str) -> None:
-            data = json.loads(message)
-            if 'k' in data and data['k']['x']: 
-                k = data['k']
-                row = f"{k['s']},{k['t']},{k['o']},{k['h']},{k['l']},{k['c']},{k['v']}\n"
-                with open(buffer_file, "a") as f:
-                    f.write(row)
-                # I use print here instead of logger to prevent the log file from growing to 10GB
-                print(f"  💾 Captured: {k['s']} @ {k['c']}     ", end="\r")
-
-        while True:
-            try:
-                ws = websocket.WebSocketApp(self.config['WS_URL'], on_open=on_open, on_message=on_message)
-                ws.run_forever()
-            except KeyboardInterrupt:
-                self.log.warning("Stream Terminated by User.")
-                print("\n") # Clear the carriage return
-                break
-            except Exception as error:
-                self.log.error(f"WebSocket Error: {error}. Reconnecting in 5 seconds.")
-                time.sleep(5)
+        shards: List[List[str]] = [self.pairs[i:i + WS_SHARD_SIZE] for i in range(0, len(self.pairs), WS_SHARD_SIZE)]
+        self.log.info(f"Streaming {len(self.pairs)} pairs over {len(shards)} connection(s).")
+
+        buffer = _KlineBuffer(buffer_file)
+        stop = threading.Event()
+        sockets: Dict[int, websocket.WebSocketApp] = {}
+        threads: List[threading.Thread] = [
+            threading.Thread(target=self._run_stream, args=(i, shard, buffer, stop, sockets), name=f"kline-shard-{i}", daemon=True)
+            for i, shard in enumerate(shards)
+        ]
+        for thread in threads:
+            thread.start()
+
+        try:
+            # join() with a timeout keeps the main thread responsive to Ctrl+C
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.log.warning("Stream Terminated by User.")
+            print("\n") # Clear the carriage return
+            stop.set()
+            for ws in list(sockets.values()):
+                ws.close()
+            for thread in threads:
+                thread.join(timeout=5)
+        finally:
+            buffer.close()
+            if buffer.dropped:
+                self.log.warning(f"Disk could not keep up: {buffer.dropped} klines were dropped from the live buffer.")
@@ -1,10 +1,14 @@
-import requests
-import time
 import json
+import os
+import orjson
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
+from tqdm import tqdm
 
-from .config import BRONZE_DIR, CRYPTO_PAIRS, COINGECKO_CONFIG
+from .config import BRONZE_DIR, CRYPTO_PAIRS, COINGECKO_CONFIG, HTTP_CONFIG
+from .http_session import TokenBucket, build_session, rate_limit_remaining, retry_after_seconds
 from src.utils.logger import get_logger
 
 class CoinGeckoIngestor:
@@ -32,10 +36,32 @@ class CoinGeckoIngestor:
         self.id_map: Dict[str, str] = COINGECKO_CONFIG["ID_MAP"]
         self.delay: int = COINGECKO_CONFIG["Delay_Seconds"]
         self.max_retries: int = COINGECKO_CONFIG["Max_Retries"]
+        self.concurrency: int = COINGECKO_CONFIG["Concurrency"]
+        self.min_remaining: int = COINGECKO_CONFIG["Min_Remaining_Calls"]
+        self.max_failures: int = COINGECKO_CONFIG["Max_Consecutive_Failures"]
 
         # Initialize the Observer-based Logger
         self.log = get_logger("CoinGeckoIngestor")
 
+        # Resolve the crawl targets once: symbols without a CoinGecko ID are reported here
+        # and never reach the crawl loop
+        self.targets: Dict[str, str] = {s: self.id_map[s] for s in CRYPTO_PAIRS if s in self.id_map}
+        unmapped: List[str] = [s for s in CRYPTO_PAIRS if s not in self.id_map]
+        if unmapped:
+            self.log.warning(f"Configuration Error: No CoinGecko ID map found for {', '.join(unmapped)}")
+
+        # Keep-alive session with one pooled connection per crawl worker
+        self.session = build_session(pool_size=self.concurrency)
+        self.session.headers.update({"Accept": "application/json"})
+
+        # One request every 'Delay_Seconds', no matter how many workers are in flight
+        self._bucket = TokenBucket(rate=1 / self.delay, burst=1)
+
+        # Circuit breaker state, shared by the crawl workers
+        self._failures: int = 0
+        self._failures_lock = threading.Lock()
+        self._circuit_open = threading.Event()
+
         # Storage: data/bronze/metadata/coingecko_raw.json
         self.output_dir: Path = BRONZE_DIR / "metadata"
 
@@ -43,20 +69,142 @@ class CoinGeckoIngestor:
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.output_file: Path = self.output_dir / "coingecko_raw.json"
 
+        # Append-only crawl journal (one JSON line per secured asset), folded into output_file at the end
+        self.journal_file: Path = self.output_dir / "coingecko_raw.jsonl"
+
+    def _fetch_one(self, symbol: str, cg_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetches and trims the CoinGecko profile of a single asset.
+
+        Runs on a worker thread. Every call first takes a token from the shared bucket,
+        so the overlapping workers together never exceed one request per 'Delay_Seconds'.
+
+        Args:
+            symbol (str): The Binance symbol (e.g., 'BTCUSDT'), used for logging.
+            cg_id (str): The CoinGecko asset ID (e.g., 'bitcoin').
+
+        Returns:
+            Optional[Dict[str, Any]]: The extracted profile, or None if the request failed.
+        """
+        # API Endpoint: specific to fetching static coin details
+        url: str = f"{self.base_url}/coins/{cg_id}?localization=false&tickers=false&market_data=false&community_data=false&developer_data=false"
+
+        # Once the circuit is open, queued assets are skipped without waiting for a token
+        if self._circuit_open.is_set():
+            return None
+
+        # Strict Rate Limit Compliance (shared by all workers)
+        self._bucket.acquire()
+
+        # The circuit may have opened while this worker waited for its token
+        if self._circuit_open.is_set():
+            return None
+
+        try:
+            resp = self.session.get(url, timeout=HTTP_CONFIG["TIMEOUT"])
+            self._record_outcome(healthy=resp.status_code != 429 and resp.status_code < 500)
+
+            # Proactive backoff: stop before the window is exhausted instead of waiting for a 429
+            remaining: Optional[int] = rate_limit_remaining(resp)
+            if remaining is not None and remaining <= self.min_remaining and resp.status_code != 429:
+                cooldown: float = retry_after_seconds(resp, default=60)
+                self.log.warning(f"Rate limit almost exhausted ({remaining} calls left). Pausing for {cooldown:.0f}s.")
+                self._bucket.pause(cooldown)
+
+            if resp.status_code == 200:
+                data: Dict[str, Any] = orjson.loads(resp.content)
+
+                # Extract only the high-value fields (Bronze = Raw, but selective)
+                links = data.get("links", {})
+                homepage_list = links.get("homepage", [])
+                homepage_url = homepage_list[0] if isinstance(homepage_list, list) and homepage_list else ""
+
+                return {
+                    "id": data.get("id"),
+                    "symbol": data.get("symbol"),
+                    "name": data.get("name"),
+                    "description": data.get("description", {}).get("en", ""),
+                    "categories": data.get("categories", []),
+                    "image": data.get("image", {}).get("large", ""),
+                    "genesis_date": data.get("genesis_date"),
+                    "homepage": homepage_url
+                }
+
+            elif resp.status_code == 429:
+                cooldown = retry_after_seconds(resp, default=60)
+                self.log.warning(f"API Rate Limit Hit (429) for {symbol}. Cooling down for {cooldown:.0f}s.")
+                self._bucket.pause(cooldown)
+            else:
+                self.log.error(f"HTTP Error for {symbol}: {resp.status_code}")
+
+        except Exception as error:
+            self.log.error(f"Network Exception for {symbol}: {error}")
+            self._record_outcome(healthy=False)
+
+        return None
+
+    def _record_outcome(self, healthy: bool) -> None:
+        """
+        Feeds one request outcome into the circuit breaker.
+
+        A healthy response resets the failure streak. After 'Max_Consecutive_Failures' failures
+        in a row (429, 5xx or network errors) the circuit opens and every remaining request is
+        skipped, instead of paying 'Delay_Seconds' per asset during an outage.
+
+        Args:
+            healthy (bool): False for rate-limit / server-error statuses and network failures.
+        """
+        with self._failures_lock:
+            self._failures = 0 if healthy else self._failures + 1
+            if self._failures >= self.max_failures and not self._circuit_open.is_set():
+                self._circuit_open.set()
+                self.log.error(f"Circuit Open: {self._failures} consecutive failures. Aborting the crawl.")
+
+    def _replay_journal(self, full_data: Dict[str, Any]) -> int:
+        """
+        Folds the entries of an interrupted crawl's journal back into the metadata state.
+
+        Args:
+            full_data (Dict[str, Any]): The state loaded from the compacted JSON file (updated in place).
+
+        Returns:
+            int: The number of journal entries recovered.
+        """
+        if not self.journal_file.exists():
+            return 0
+
+        recovered: int = 0
+        with open(self.journal_file, "rb") as f:
+            for line in f:
+                try:
+                    entry: Dict[str, Any] = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    # A crash mid-append can leave one truncated last line; everything before it is intact
+                    self.log.warning("Truncated journal line found. Ignoring it.")
+                    continue
+                full_data[entry["symbol"]] = entry["profile"]
+                recovered += 1
+        return recovered
+
     def ingest_metadata(self) -> None:
         """
         Executes the rate-limited crawling strategy to harvest asset details.
 
         Workflow:
         1. Loads existing metadata state (Resume Capability).
-        2. Iterates through the Master Asset List defined in Config.
-        3. Maps the Binance Symbol (e.g., BTCUSDT) to the CoinGecko ID (e.g., bitcoin).
-        4. Fetches and saves the data incrementally to prevent loss during crashes.
+        2. Maps every Binance Symbol (e.g., BTCUSDT) in Config to its CoinGecko ID (e.g., bitcoin).
+        3. Fetches the missing profiles on a small thread pool. The token bucket still
+           enforces one request per 'Delay_Seconds'; the pool only overlaps the network
+           latency of each request with the wait for the next slot. A circuit breaker ends
+           the crawl early after repeated 429/5xx/network failures.
+        4. Appends each secured profile to a JSONL journal (one small write per asset, from
+           the main thread) to prevent loss during crashes, then compacts the journal into
+           the JSON output once at the end.
 
         Outputs:
             A JSON file containing the 'Rich Context' for all tracked assets.
         """
-        self.log.info(f"Initiating CoinGecko Metadata Crawl for {len(CRYPTO_PAIRS)} assets.")
+        self.log.info(f"Initiating CoinGecko Metadata Crawl for {len(self.targets)} assets.")
         self.log.info(f"Rate Limit Protocol Active: Delay set to {self.delay}s per request.")
 
         # 1. Load existing data if we have it
@@ -70,69 +218,50 @@ class CoinGeckoIngestor:
                 self.log.warning("Corrupt JSON found. Starting fresh.")
                 full_data = {}
 
-        # 2. Crawl
-        for symbol in CRYPTO_PAIRS:
+        recovered: int = self._replay_journal(full_data)
+        if recovered:
+            self.log.info(f"Recovered {recovered} assets from the journal of an interrupted crawl.")
+
+        # 2. Resolve the assets that still need crawling
+        pending: Dict[str, str] = {}
+        for symbol, cg_id in self.targets.items():
             # Skip if we already have valid data for this coin
             if symbol in full_data and full_data[symbol].get("description"):
-                self.log.info(f"Skipping {symbol} (Metadata already secured)")
+                self.log.info("Skipping %s (Metadata already secured)", symbol)
                 continue
 
-            cg_id: Optional[str] = self.id_map.get(symbol)
-            if not cg_id:
-                self.log.warning(f"Configuration Error: No CoinGecko ID map found for {symbol}")
-                continue
+            pending[symbol] = cg_id
 
-            # API Endpoint: specific to fetching static coin details
-            url: str = f"{self.base_url}/coins/{cg_id}?localization=false&tickers=false&market_data=false&community_data=false&developer_data=false"
+        # 3. Crawl (the progress bar stays pinned below the log lines)
+        secured: int = 0
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor, open(self.journal_file, "ab") as journal:
+            futures = {executor.submit(self._fetch_one, symbol, cg_id): symbol for symbol, cg_id in pending.items()}
 
-            try:
-                # Terminal UI only (not logged) to avoid spamming the log file with 'Fetching.' states
-                print(f"  ⬇️  Fetching Context: {symbol} ({cg_id}).", end="\r")
-
-                resp = requests.get(url)
-
-                if resp.status_code == 200:
-                    data: Dict[str, Any] = resp.json()
-
-                    # Extract only the high-value fields (Bronze = Raw, but selective)
-                    links = data.get("links", {})
-                    homepage_list = links.get("homepage", [])
-                    homepage_url = homepage_list[0] if isinstance(homepage_list, list) and homepage_list else ""
-
-                    extracted: Dict[str, Any] = {
-                        "id": data.get("id"),
-                        "symbol": data.get("symbol"),
-                        "name": data.get("name"),
-                        "description": data.get("description", {}).get("en", ""),
-                        "categories": data.get("categories", []),
-                        "image": data.get("image", {}).get("large", ""),
-                        "genesis_date": data.get("genesis_date"),
-                        "homepage": homepage_url
-                    }
-
-                    full_data[symbol] = extracted
-
-                    # Log the success and clear the terminal line
-                    print(" " * 50, end="\r") 
-                    self.log.info(f"Secured Metadata: {symbol}")
-
-                    # Atomic Write pattern to prevent data loss
-                    with open(self.output_file, "w") as f:
-                        json.dump(full_data, f, indent=4)
-
-                elif resp.status_code == 429:
-                    print(" " * 50, end="\r") 
-                    self.log.warning(f"API Rate Limit Hit (429) for {symbol}. Cooling down for 60s.")
-                    time.sleep(60)
-                else:
-                    print(" " * 50, end="\r") 
-                    self.log.error(f"HTTP Error for {symbol}: {resp.status_code}")
-
-            except Exception as error:
-                print(" " * 50, end="\r") 
-                self.log.error(f"Network Exception for {symbol}: {error}")
-
-            # 3. Strict Rate Limit Compliance
-            time.sleep(self.delay)
+            for future in tqdm(as_completed(futures), total=len(futures), unit="asset", desc="Crawling"):
+                symbol = futures[future]
+                extracted: Optional[Dict[str, Any]] = future.result()
+                if extracted is None:
+                    continue
+
+                full_data[symbol] = extracted
+                secured += 1
+                self.log.info("Secured Metadata: %s", symbol)
+
+                # 4. Journal the asset: O(1) bytes per asset instead of rewriting the whole file
+                journal.write(orjson.dumps({"symbol": symbol, "profile": extracted}) + b"\n")
+                journal.flush()
+
+        if self._circuit_open.is_set():
+            self.log.warning(f"Crawl aborted by the circuit breaker. {len(pending) - secured} assets left for the next run.")
+
+        # 5. Compact: one full write of the merged state, then drop the journal.
+        # Written to a temp file and swapped in with os.replace, so a crash mid-write can
+        # never leave a half-written coingecko_raw.json behind (the journal is still there).
+        tmp_file: Path = self.output_file.with_suffix(".json.tmp")
+        # Compact orjson output: no indent, so roughly half the bytes and a fraction of the CPU
+        with open(tmp_file, "wb") as f:
+            f.write(orjson.dumps(full_data, option=orjson.OPT_APPEND_NEWLINE))
+        os.replace(tmp_file, self.output_file)
+        self.journal_file.unlink(missing_ok=True)
 
         self.log.info(f"Metadata Enrichment Complete. Asset Profiles saved to: {self.output_file}")
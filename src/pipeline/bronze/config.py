@@ -12,7 +12,7 @@ Key Responsibilities:
 """
 
 from pathlib import Path
-from typing import List, Dict, Union
+from typing import List, Dict, Tuple, Union
 
 # --- DIRECTORY SETUP ---
 # Resolves to the absolute path of: project_root/data/bronze
@@ -51,16 +51,65 @@ CRYPTO_PAIRS: List[str] = [
 BINANCE_CONFIG: Dict[str, str] = {
     "MONTHLY_URL": "https://data.binance.vision/data/spot/monthly/klines",
     "DAILY_URL": "https://data.binance.vision/data/spot/daily/klines",
-    "WS_URL": "wss://stream.binance.com:9443/ws",
+    # Combined-stream endpoint: streams are chosen in the URL, frames arrive as {"stream": ..., "data": ...}
+    "WS_URL": "wss://stream.binance.com:9443/stream",
     "INTERVAL": "1m"  # The granular time-frame for all data (1-Minute Candles)
 }
 
+# Number of concurrent archive downloads. Downloads are network-bound, so threads scale
+# almost linearly until Binance Vision's per-host limits kick in.
+DOWNLOAD_WORKERS: int = 12
+
+# Request budget shared by all download workers (Binance allows 1200 request weight/min;
+# I stay below it). BURST is how many requests may go out back-to-back after an idle period.
+BINANCE_RATE_LIMIT: Dict[str, int] = {
+    "REQUESTS_PER_MINUTE": 1000,
+    "BURST": 50
+}
+
+# Adaptive download concurrency (AIMD): starts at INITIAL_WORKERS, grows by 0.5 per response
+# answered within TARGET_LATENCY_SECONDS and halves on slow answers, 429/418/5xx or network errors.
+# DOWNLOAD_WORKERS is the ceiling.
+BINANCE_CONCURRENCY: Dict[str, float] = {
+    "INITIAL_WORKERS": 4,
+    "MIN_WORKERS": 1,
+    "TARGET_LATENCY_SECONDS": 2.0
+}
+
+# Shared HTTP client settings. TIMEOUT is (connect, read) in seconds; MAX_RETRIES and
+# BACKOFF_FACTOR only apply to connection errors and 5xx responses. CHUNK_SIZE is the
+# buffer (bytes) used when streaming archive bodies. Archives up to IN_MEMORY_MAX_BYTES are
+# validated in RAM before touching disk; larger (or unsized) ones stream straight to disk.
+HTTP_CONFIG: Dict[str, Union[int, float, Tuple[int, int]]] = {
+    "TIMEOUT": (5, 30),
+    "CHUNK_SIZE": 1 << 16,
+    "IN_MEMORY_MAX_BYTES": 64 << 20,
+    "MAX_RETRIES": 5,
+    "BACKOFF_FACTOR": 0.5
+}
+
+# WebSocket reconnect policy: exponential backoff (1s, 2s, 4s ...) capped at MAX_DELAY_SECONDS,
+# plus up to 1s of random jitter on top, so a fleet of clients doesn't reconnect in lockstep.
+WS_RECONNECT_CONFIG: Dict[str, float] = {
+    "MAX_DELAY_SECONDS": 60.0
+}
+
+# Pairs per WebSocket connection. Binance caps streams per connection (1024) and the
+# combined-stream URL grows with every pair, so larger rosters are split across connections.
+WS_SHARD_SIZE: int = 150
+
 # --- METADATA PROVIDER SETTINGS ---
 # I use CoinGecko to fetch 'Rich Context' (Logos, Descriptions, Categories).
 COINGECKO_CONFIG: Dict[str, Union[str, int, Dict[str, str]]] = {
     "BASE_URL": "https://api.coingecko.com/api/v3",
     "Max_Retries": 3,
     "Delay_Seconds": 15,
+    # Pause proactively once 'X-RateLimit-Remaining' drops to this many calls
+    "Min_Remaining_Calls": 2,
+    # Requests kept in flight at once; the Delay_Seconds budget is still shared by all of them
+    "Concurrency": 4,
+    # Circuit breaker: abort the crawl (keeping what was secured) after this many 429/5xx/network failures in a row
+    "Max_Consecutive_Failures": 5,
     # I map Binance Symbols (BTCUSDT) to CoinGecko IDs (bitcoin)
     "ID_MAP": {
         # Kings
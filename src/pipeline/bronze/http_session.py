@@ -0,0 +1,227 @@
+"""
+HTTP Session Factory for the Bronze Ingestion Layer.
+
+Every ingestor talks to its provider through a long-lived 'requests.Session' instead of
+the module-level 'requests.get'. A session keeps TCP+TLS connections alive in a pool, so
+thousands of archive downloads pay the handshake once per connection rather than once per file.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import HTTP_CONFIG
+
+class _ServerErrorRetry(Retry):
+    """
+    urllib3 Retry that leaves rate-limit responses to the caller.
+
+    With respect_retry_after_header, urllib3 also retries any 413/429 carrying a Retry-After
+    header, even when it is not in status_forcelist. Limiting that set to 503 keeps the
+    server's hint for maintenance windows while every 429 reaches the ingestor's own
+    cool-down (TokenBucket.pause / AIMD) after exactly one request.
+    """
+
+    RETRY_AFTER_STATUS_CODES = frozenset({503})
+
+def build_session(pool_size: int) -> requests.Session:
+    """
+    Builds a pooled HTTP session with transparent retries for transient server errors.
+
+    Rate-limit responses (429/418) are deliberately NOT retried here; each ingestor has its
+    own cool-down protocol for those and needs to see the status code.
+
+    Args:
+        pool_size (int): Maximum connections kept per host. Must be at least the number of
+                         worker threads sharing the session, otherwise urllib3 discards the
+                         extra connections ('Connection pool is full').
+
+    Returns:
+        requests.Session: A session with the pooled adapter mounted for HTTPS and HTTP.
+    """
+    retries = _ServerErrorRetry(
+        total=HTTP_CONFIG["MAX_RETRIES"],
+        backoff_factor=HTTP_CONFIG["BACKOFF_FACTOR"],
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=["GET", "HEAD"],
+        respect_retry_after_header=True,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retries)
+
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+class TokenBucket:
+    """
+    A thread-safe token bucket shared by every worker that talks to the same provider.
+
+    Tokens refill continuously at 'rate' per second up to 'burst'. Each request takes one
+    token, blocking until one is available, so N parallel workers together never exceed the
+    provider's request budget. A rate-limit response can 'pause' the whole bucket, which
+    makes every worker back off at once instead of each discovering the ban separately.
+
+    Attributes:
+        rate (float): Tokens added per second (the sustained request rate).
+        burst (int): Bucket capacity (the largest burst allowed after an idle period).
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        """
+        Initializes a full bucket.
+
+        Args:
+            rate (float): Sustained requests per second.
+            burst (int): Maximum number of requests that may be issued back-to-back.
+        """
+        self.rate: float = rate
+        self.burst: int = burst
+        self._tokens: float = float(burst)
+        self._updated: float = time.monotonic()
+        self._paused_until: float = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """
+        Blocks until a token is available (and any pause has expired), then consumes it.
+        """
+        while True:
+            with self._lock:
+                now: float = time.monotonic()
+                if now < self._paused_until:
+                    wait: float = self._paused_until - now
+                else:
+                    self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+
+            # Sleep outside the lock so other workers can still check the bucket
+            time.sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Stops every worker from acquiring tokens for 'seconds', then resumes with an empty
+        bucket so traffic ramps back up at the sustained rate instead of bursting.
+
+        Args:
+            seconds (float): How long to hold all requests.
+        """
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+            self._tokens = 0.0
+            self._updated = self._paused_until
+
+class AIMDLimiter:
+    """
+    A concurrency limit that adapts to the server using Additive-Increase / Multiplicative-Decrease.
+
+    Workers call 'acquire()' before a request and 'release()' after it, reporting how long
+    the server took to answer and whether the answer was healthy. Every healthy, fast
+    response raises the limit by 'increase' (up to 'maximum'); a slow response, a 429/418/5xx
+    or a connection error multiplies it by 'decrease' (down to 'minimum'). Throughput
+    settles near the server's knee instead of oscillating between idle and throttled.
+
+    Attributes:
+        limit (float): The current number of requests allowed in flight (floored when used).
+    """
+
+    def __init__(self, initial: int, minimum: int, maximum: int, target_latency: float,
+                 increase: float = 0.5, decrease: float = 0.5) -> None:
+        """
+        Initializes the limiter.
+
+        Args:
+            initial (int): Starting concurrency.
+            minimum (int): The limit never drops below this.
+            maximum (int): The limit never grows past this (e.g. the thread-pool size).
+            target_latency (float): Response latency (seconds) above which the limit shrinks.
+            increase (float, optional): Additive step on a healthy response. Defaults to 0.5.
+            decrease (float, optional): Multiplicative factor on congestion. Defaults to 0.5.
+        """
+        self.limit: float = float(initial)
+        self.minimum: int = minimum
+        self.maximum: int = maximum
+        self.target_latency: float = target_latency
+        self.increase: float = increase
+        self.decrease: float = decrease
+        self._in_flight: int = 0
+        self._cond = threading.Condition()
+
+    def acquire(self) -> None:
+        """
+        Blocks until the number of in-flight requests is below the current limit.
+        """
+        with self._cond:
+            while self._in_flight >= int(self.limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self, latency: Optional[float], healthy: bool) -> None:
+        """
+        Frees a slot and adapts the limit from the request's outcome.
+
+        Args:
+            latency (Optional[float]): Seconds until the response headers arrived (None if none did).
+            healthy (bool): False for rate-limit / server-error statuses and network failures.
+        """
+        with self._cond:
+            self._in_flight -= 1
+            if healthy and latency is not None and latency <= self.target_latency:
+                self.limit = min(self.maximum, self.limit + self.increase)
+            else:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+            self._cond.notify_all()
+
+def rate_limit_remaining(resp: requests.Response) -> Optional[int]:
+    """
+    Reads how many calls the provider says are left in the current rate-limit window.
+
+    Args:
+        resp (requests.Response): Any response from the provider.
+
+    Returns:
+        Optional[int]: The 'X-RateLimit-Remaining' value, or None if the header is absent/invalid.
+    """
+    header = resp.headers.get("X-RateLimit-Remaining")
+    try:
+        return int(header) if header is not None else None
+    except ValueError:
+        return None
+
+def retry_after_seconds(resp: requests.Response, default: float) -> float:
+    """
+    Reads how long the server asked us to back off from its 'Retry-After' header.
+
+    Args:
+        resp (requests.Response): The rate-limited (429/418/503) response.
+        default (float): The cool-down to use when the header is missing or unparseable.
+
+    Returns:
+        float: The number of seconds to wait (never negative).
+    """
+    header = resp.headers.get("Retry-After")
+    if not header:
+        return default
+
+    # The header is either delta-seconds ("120") or an HTTP-date
+    try:
+        return max(0.0, float(header))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(header)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return default
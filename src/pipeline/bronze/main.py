@@ -12,8 +12,8 @@ Usage:
 import argparse
 from typing import Optional
 
-from .binance_ingestor import BinanceIngestor
-from .coingecko_ingestor import CoinGeckoIngestor
+# The concrete ingestors (requests, websocket-client, orjson, tqdm ...) are imported lazily
+# in main(), once the arguments are valid, so '--help' and usage errors return instantly.
 from .base_ingestor import BaseIngestor
 from src.utils.logger import get_logger
 
@@ -52,6 +52,7 @@ def main() -> None:
         # Metadata is special; it doesn't need a specific 'source' arg usually, 
         # but I default to CoinGecko for now.
         log.info("Routing to Metadata Enrichment Strategy (CoinGecko).")
+        from .coingecko_ingestor import CoinGeckoIngestor
         crawler = CoinGeckoIngestor()
         crawler.ingest_metadata()
 
@@ -63,16 +64,13 @@ def main() -> None:
 
     if args.source == "binance":
         log.info("Routing to Market Data Strategy (Binance).")
+        from .binance_ingestor import BinanceIngestor
         ingestor = BinanceIngestor()
 
     # Execute the selected strategy
     if ingestor:
-        if args.mode == "historical":
-            ingestor.ingest_historical()
-        elif args.mode == "recent":
-            ingestor.ingest_recent()
-        elif args.mode == "live":
-            ingestor.ingest_live()
+        # Every --mode choice maps onto an 'ingest_<mode>' method of the BaseIngestor contract
+        getattr(ingestor, f"ingest_{args.mode}")()
 
         log.info("=== BRONZE PIPELINE FINISHED ===")
     else:
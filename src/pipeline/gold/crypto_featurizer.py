@@ -146,6 +146,14 @@ class CryptoFeaturizer(BaseFeaturizer):
 
         output_file: Path = coin_dir / "features.parquet"
 
-        # Save with Snappy compression (Fast & Efficient)
-        df.to_parquet(output_file, compression="snappy")
+        # Save with ZSTD compression (smaller than Snappy) and bounded row groups.
+        # Rows are already time-ordered, so each row group carries tight min/max statistics.
+        df.to_parquet(
+            output_file,
+            engine="pyarrow",
+            compression="zstd",
+            compression_level=3,
+            row_group_size=64_000,
+            write_statistics=True,
+        )
         self.log.info(f"Saved Gold Data: {coin_id.upper()} ({len(df):,} rows, {len(df.columns)} features)")
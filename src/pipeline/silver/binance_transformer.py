@@ -1,3 +1,4 @@
+import os
 import pandas as pd
 import zipfile
 from datetime import datetime, timezone
@@ -31,6 +32,25 @@ class BinanceTransformer(BaseTransformer):
         self.pairs = CRYPTO_PAIRS
         self.log = get_logger("BinanceTransformer")
 
+    def _scan_archives(self, directory: Path) -> list[os.DirEntry]:
+        """
+        Internal Helper: Lists the zip archives of a Bronze folder in a single directory read.
+
+        os.scandir returns the names (and file types) straight from the directory listing,
+        so no Path object or extra stat call is created per archive. Entries are
+        os.PathLike and can be handed to zipfile directly.
+
+        Args:
+            directory (Path): The Bronze folder of one asset (e.g., '.../historical_monthly/btc').
+
+        Returns:
+            list[os.DirEntry]: The '.zip' entries sorted by filename (i.e., chronologically).
+        """
+        with os.scandir(directory) as entries:
+            archives = [entry for entry in entries if entry.is_file() and entry.name.endswith(".zip")]
+        archives.sort(key=lambda entry: entry.name)
+        return archives
+
     def _transform_dataframe(self, df: pd.DataFrame, symbol: str) -> pd.DataFrame:
         """
         Internal Helper: Applies the core business logic to a raw DataFrame.
@@ -114,7 +134,7 @@ class BinanceTransformer(BaseTransformer):
 
             # memory buffer for all monthly data of this coin
             all_dfs = []
-            zip_files = sorted(list(coin_source_path.glob("*.zip")))
+            zip_files = self._scan_archives(coin_source_path)
 
             for zip_path in zip_files:
                 try:
@@ -186,7 +206,7 @@ class BinanceTransformer(BaseTransformer):
                 continue
 
             # Find daily zips
-            zip_files = sorted(list(coin_recent_path.glob("*.zip")))
+            zip_files = self._scan_archives(coin_recent_path)
             if not zip_files:
                 continue
 
@@ -7,10 +7,17 @@ to manage logging across the data pipeline. It decouples the act of logging
 for highly extensible and scalable monitoring.
 """
 
+import os
+import threading
 from abc import ABC, abstractmethod
 from datetime import datetime
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List
+
+from tqdm import tqdm
+
+# Numeric severities, so a logger can drop everything below its threshold
+LEVELS: Dict[str, int] = {"INFO": 20, "WARNING": 30, "ERROR": 40}
 
 class LogObserver(ABC):
     """
@@ -58,7 +65,8 @@ class ConsoleObserver(LogObserver):
             "ENDC": "\033[0m"      # Reset
         }
         color = colors.get(level, colors["ENDC"])
-        print(f"{color}[{level}] {message}{colors['ENDC']}")
+        # tqdm.write behaves like print, but keeps any active progress bar pinned below the message
+        tqdm.write(f"{color}[{level}] {message}{colors['ENDC']}")
 
 class FileObserver(LogObserver):
     """
@@ -105,11 +113,13 @@ class LogSubject(ABC):
 
     Attributes:
         _observers (List[LogObserver]): The internal list of subscribed observers.
+        _lock (threading.Lock): Serializes broadcasts so concurrent workers don't interleave lines.
     """
 
     def __init__(self) -> None:
         """Initializes an empty list of observers."""
         self._observers: List[LogObserver] = []
+        self._lock = threading.Lock()
 
     def attach(self, observer: LogObserver) -> None:
         """
@@ -139,8 +149,9 @@ class LogSubject(ABC):
             level (str): The severity level of the event.
             message (str): The core message to broadcast.
         """
-        for observer in self._observers:
-            observer.update(level, message)
+        with self._lock:
+            for observer in self._observers:
+                observer.update(level, message)
 
 class PipelineLogger(LogSubject):
     """
@@ -149,19 +160,43 @@ class PipelineLogger(LogSubject):
     This class provides the actual methods (`info`, `warning`, `error`) 
     that the pipeline code will interact with. When one of these methods 
     is called, it triggers the `notify` process inherited from `LogSubject`.
+
+    Messages below the logger's level are dropped before anything is formatted or
+    broadcast. Hot loops can pass printf-style arguments (`log.info("Secured %s", symbol)`),
+    which are only interpolated when the message is actually emitted.
+
+    Attributes:
+        level (int): The minimum severity (see LEVELS) that gets broadcast.
     """
-    
-    def info(self, message: str) -> None:
+
+    def __init__(self, level: str = "INFO") -> None:
+        """
+        Initializes the logger.
+
+        Args:
+            level (str, optional): The minimum severity to emit ('INFO', 'WARNING' or 'ERROR').
+                                   Defaults to "INFO".
+        """
+        super().__init__()
+        self.level: int = LEVELS.get(level.upper(), LEVELS["INFO"])
+
+    def _log(self, level: str, message: str, args: tuple) -> None:
+        # Filters by level first, so suppressed messages cost a single comparison
+        if LEVELS[level] < self.level:
+            return
+        self.notify(level, message % args if args else message)
+
+    def info(self, message: str, *args: Any) -> None:
         """Logs an informational message (standard execution flow)."""
-        self.notify("INFO", message)
+        self._log("INFO", message, args)
 
-    def warning(self, message: str) -> None:
+    def warning(self, message: str, *args: Any) -> None:
         """Logs a warning message (non-critical issues)."""
-        self.notify("WARNING", message)
+        self._log("WARNING", message, args)
 
-    def error(self, message: str) -> None:
+    def error(self, message: str, *args: Any) -> None:
         """Logs an error message (critical failures or API rejections)."""
-        self.notify("ERROR", message)
+        self._log("ERROR", message, args)
 
 def get_logger(filename: str = "pipeline.log") -> PipelineLogger:
     """
@@ -169,7 +204,8 @@ def get_logger(filename: str = "pipeline.log") -> PipelineLogger:
 
     This helper function creates a PipelineLogger instance, locates the 
     project root to define the log directory, and automatically attaches 
-    the ConsoleObserver and FileObserver.
+    the ConsoleObserver and FileObserver. The 'LOG_LEVEL' environment variable
+    (INFO, WARNING or ERROR) sets the minimum severity; it defaults to INFO.
 
     Args:
         filename (str, optional): The name of the output file. Defaults to "pipeline.log".
@@ -177,7 +213,7 @@ def get_logger(filename: str = "pipeline.log") -> PipelineLogger:
     Returns:
         PipelineLogger: The fully configured Subject ready to accept messages.
     """
-    logger = PipelineLogger()
+    logger = PipelineLogger(level=os.getenv("LOG_LEVEL", "INFO"))
     
     # Define where the log file should live dynamically relative to this script
     project_root = Path(__file__).resolve().parent.parent.parent
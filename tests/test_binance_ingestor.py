@@ -0,0 +1,20 @@
+from src.pipeline.bronze.binance_ingestor import _reconnect_delay
+from src.pipeline.bronze.config import WS_RECONNECT_CONFIG
+
+def test_reconnect_delay_is_capped_and_jittered():
+    """
+    Verifies the WebSocket reconnect backoff stays bounded and jittered at any attempt count.
+
+    Checks:
+    1. Early attempts grow exponentially (1s, 2s, 4s ... plus under 1s of jitter).
+    2. A very long outage (thousands of failed attempts) neither overflows nor exceeds the cap.
+    3. At the cap, the jitter survives, so shards don't reconnect in lockstep.
+    """
+    max_delay = WS_RECONNECT_CONFIG["MAX_DELAY_SECONDS"]
+
+    for attempts in range(4):
+        assert 2 ** attempts <= _reconnect_delay(attempts) < 2 ** attempts + 1
+
+    capped = [_reconnect_delay(5000) for _ in range(50)]
+    assert all(max_delay <= delay < max_delay + 1 for delay in capped)
+    assert len(set(capped)) > 1
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+from src.dashboard_utils import format_large_number, downsample_lttb
+
+def test_format_large_number_scales():
+    """
+    Verifies the suffix table picks the right scale at every boundary.
+
+    Checks:
+    1. Values below one million are printed in full with thousands separators.
+    2. Millions and billions use two decimals and the 'M' / 'B' suffix.
+    3. Null inputs (NaN, None) render as 'N/A' instead of raising.
+    """
+    assert format_large_number(10_500) == "$10,500"
+    assert format_large_number(999_999.4) == "$999,999"
+    assert format_large_number(1_000_000) == "$1.00M"
+    assert format_large_number(500_000_000) == "$500.00M"
+    assert format_large_number(1_250_000_000) == "$1.25B"
+    assert format_large_number(float("nan")) == "N/A"
+    assert format_large_number(None) == "N/A"
+
+def test_downsample_lttb_keeps_shape():
+    """
+    Verifies LTTB returns a bounded, ordered subset that preserves extremes.
+
+    Checks:
+    1. Exactly n_out sorted row positions are returned, starting and ending at the series bounds.
+    2. A single spike in the middle of a flat series survives downsampling.
+    3. Short series (and datetime x values) are returned untouched.
+    """
+    y = np.zeros(10_000)
+    y[4321] = 100.0
+    x = np.arange(len(y))
+
+    keep = downsample_lttb(x, y, n_out=500)
+
+    assert len(keep) == 500
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert np.all(np.diff(keep) > 0)
+    assert 4321 in keep
+
+    timestamps = pd.date_range("2025-01-01", periods=50, freq="h").values
+    assert np.array_equal(downsample_lttb(timestamps, np.arange(50.0), n_out=500), np.arange(50))
@@ -0,0 +1,69 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.pipeline.bronze.http_session import build_session
+
+@pytest.fixture
+def scripted_server():
+    """
+    Serves a scripted sequence of (status, headers) responses on localhost.
+
+    Yields:
+        Tuple[str, List[Tuple[int, dict]], List[int]]: The base URL, the response script
+        (consumed in order, the last entry repeats) and the list of served status codes.
+    """
+    script, served = [], []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            status, headers = script.pop(0) if len(script) > 1 else script[0]
+            served.append(status)
+            self.send_response(status)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/", script, served
+    server.shutdown()
+    server.server_close()
+
+def test_rate_limit_is_not_retried(scripted_server):
+    """
+    Verifies a 429 with Retry-After reaches the caller after exactly one request.
+
+    Checks:
+    1. urllib3 does not retry the 429 internally (it would bypass the shared cool-down).
+    2. The caller sees the 429 status code.
+    """
+    url, script, served = scripted_server
+    script.append((429, {"Retry-After": "1"}))
+
+    resp = build_session(pool_size=1).get(url, timeout=5)
+
+    assert resp.status_code == 429
+    assert served == [429]
+
+def test_server_error_is_retried(scripted_server):
+    """
+    Verifies transient 5xx responses are still retried transparently.
+
+    Checks:
+    1. A 503 followed by a 200 returns the 200 to the caller.
+    2. Exactly two requests were made.
+    """
+    url, script, served = scripted_server
+    script.extend([(503, {"Retry-After": "0"}), (200, {})])
+
+    resp = build_session(pool_size=1).get(url, timeout=5)
+
+    assert resp.status_code == 200
+    assert served == [503, 200]